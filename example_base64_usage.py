@@ -5,7 +5,7 @@ Example usage of the MarkItDown Server base64 endpoint.
 This demonstrates how to convert various file types to markdown using base64 encoding.
 """
 
-import base64
+import pybase64
 import requests
 import json
 
@@ -26,7 +26,7 @@ def convert_file_base64(file_path, server_url="http://localhost:8000"):
             file_content = f.read()
         
         # Encode to base64
-        base64_content = base64.b64encode(file_content).decode('utf-8')
+        base64_content = pybase64.b64encode(file_content).decode('utf-8')
         
         # Prepare request
         request_data = {
@@ -62,7 +62,7 @@ def convert_text_base64(text_content, filename="document.txt", server_url="http:
     """
     try:
         # Encode to base64
-        base64_content = base64.b64encode(text_content.encode('utf-8')).decode('utf-8')
+        base64_content = pybase64.b64encode(text_content.encode('utf-8')).decode('utf-8')
         
         # Prepare request
         request_data = {
@@ -0,0 +1,25 @@
+"""
+Shared HTTP client settings for the manual test scripts in this directory.
+"""
+
+import os
+
+import httpx
+
+# Server configuration
+BASE_URL = "http://localhost:8000"
+
+# 1 s to connect, 5 s per read: a stuck server fails the case instead of hanging the run.
+TIMEOUT = httpx.Timeout(5.0, connect=1.0)
+
+# Previews are skipped with TEST_VERBOSE=false, e.g. for CI logs that are parsed rather than read.
+VERBOSE = os.getenv("TEST_VERBOSE", "true").lower() in ("true", "1", "yes", "on")
+# Flattens previews onto one line.
+PREVIEW_TABLE = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
+
+# One keep-alive connection pool shared by every request a script makes.
+CLIENT = httpx.Client(
+    base_url=BASE_URL,
+    timeout=TIMEOUT,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+)
@@ -7,6 +7,10 @@ VENV_PYTHON="${PROJECT_ROOT}/.venv/bin/python"
 
 HOST="${HOST:-0.0.0.0}"
 PORT="${PORT:-8000}"
+# Usable CPUs, including a container's cgroup CPU quota, which nproc ignores.
+WORKERS="${WEB_CONCURRENCY:-$(PYTHONPATH="${PROJECT_ROOT}/src" "${VENV_PYTHON}" -c 'from markitdown_server.workers import available_cpus; print(available_cpus())')}"
+# Exported so each worker sizes its conversion limit and cache for the same count.
+export WEB_CONCURRENCY="${WORKERS}"
 
 if [[ ! -x "${VENV_PYTHON}" ]]; then
   echo "Missing virtualenv python at ${VENV_PYTHON}" >&2
@@ -15,4 +19,4 @@ if [[ ! -x "${VENV_PYTHON}" ]]; then
 fi
 
 cd "${PROJECT_ROOT}"
-exec "${VENV_PYTHON}" -m uvicorn markitdown_server.main:app --host "${HOST}" --port "${PORT}" --app-dir src
+exec "${VENV_PYTHON}" -m uvicorn markitdown_server.main:app --host "${HOST}" --port "${PORT}" --workers "${WORKERS}" --loop uvloop --http httptools --app-dir src
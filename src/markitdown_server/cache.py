@@ -0,0 +1,63 @@
+"""In-process cache of conversion results for repeated uploads."""
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from blake3 import blake3
+
+CacheKey = tuple[bytes, str]
+
+
+def content_digest(data: bytes | memoryview) -> bytes:
+    # BLAKE3 is cryptographic, so a crafted collision cannot serve one client another's document, and its SIMD
+    # tree hashing runs several times faster than SHA-256.
+    return blake3(data).digest()
+
+
+def content_hasher() -> blake3:
+    # Incremental counterpart of content_digest for payloads that arrive in pieces.
+    return blake3()
+
+
+class ConversionCache:
+    """Thread-safe LRU mapping ``(content digest, extension)`` to converted markdown.
+
+    Bounded both by entry count and by the memory held in cached strings. Conversions run in worker threads, so
+    every access is guarded by a lock. ``max_entries=0`` disables caching.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: OrderedDict[CacheKey, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        if not self.max_entries:
+            return None
+        with self._lock:
+            markdown = self._entries.get(key)
+            if markdown is not None:
+                self._entries.move_to_end(key)
+            return markdown
+
+    def put(self, key: CacheKey, markdown: str) -> None:
+        size = sys.getsizeof(markdown)
+        if not self.max_entries or size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= sys.getsizeof(previous)
+            self._entries[key] = markdown
+            self.size_bytes += size
+            while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size_bytes -= sys.getsizeof(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
@@ -0,0 +1,149 @@
+"""Content sniffing: magic-number signatures first, then cheap text heuristics on the head of the document.
+
+Pure functions over bytes, importable without building the app or loading MarkItDown/Magika.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Optional
+
+_TEXT_SNIFF_BYTES = 8 * 1024
+_JSON_VALIDATE_MAX_BYTES = 64 * 1024
+_TAIL_SNIFF_BYTES = 64
+# One case-insensitive pass over the raw sniffed bytes instead of lowercasing and scanning once per tag.
+_HTML_TAG_RE = re.compile(rb"<(?:html|head|body|div|p|span)", re.IGNORECASE)
+
+
+# Ordered by how common each format is among uploads; prefixes sharing an extension are tested in one C-level call.
+_BINARY_SIGNATURES: dict[str, tuple[bytes, ...]] = {
+    ".pdf": (b"%PDF",),
+    ".zip": (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08"),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".jpg": (b"\xff\xd8\xff", b"\xff\xe0"),
+    ".gif": (b"GIF8",),
+    ".rtf": (b"{\\rtf",),
+    ".bmp": (b"BM",),
+    ".wav": (b"RIFF",),
+    ".mp3": (b"ID3", b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"),
+    ".m4a": (b"ftyp",),
+    ".ogg": (b"OggS",),
+    ".flac": (b"fLaC",),
+    ".webp": (b"WEBP",),
+    ".epub": (b"EPUB",),
+    ".ico": (b"\x00\x00\x01\x00",),
+    ".cur": (b"\x00\x00\x02\x00",),
+    ".tar": (b"ustar\x20\x20\x00", b"ustar\x00"),
+    ".gz": (b"\x1f\x8b",),
+    ".bz2": (b"BZh",),
+    ".xz": (b"\xfd7zXZ\x00",),
+    ".7z": (b"7z\xbc\xaf\x27\x1c",),
+    ".rar": (b"Rar!\x1a\x07\x00",),
+}
+
+
+def _bucket_signatures(signatures: dict[str, tuple[bytes, ...]]) -> dict[bytes, tuple[tuple[tuple[bytes, ...], str], ...]]:
+    buckets: dict[bytes, dict[str, tuple[bytes, ...]]] = {}
+    for extension, prefixes in signatures.items():
+        for prefix in prefixes:
+            bucket = buckets.setdefault(prefix[:1], {})
+            bucket[extension] = (*bucket.get(extension, ()), prefix)
+    return {first_byte: tuple((prefixes, extension) for extension, prefixes in bucket.items()) for first_byte, bucket in buckets.items()}
+
+
+# One dict lookup on the first byte, then one tuple-startswith per candidate extension.
+_SIGNATURES_BY_FIRST_BYTE = _bucket_signatures(_BINARY_SIGNATURES)
+
+
+def detect_office_format(content: bytes) -> str:
+    # OOXML/EPUB member names are ASCII lowercase, so a raw byte search needs no decode or case folding.
+    header = content[:2000]
+    if b"word/" in header or b"document.xml" in header:
+        return ".docx"
+    if b"xl/" in header or b"workbook.xml" in header:
+        return ".xlsx"
+    if b"ppt/" in header or b"presentation.xml" in header:
+        return ".pptx"
+    if b"epub" in header or b"container.xml" in header:
+        return ".epub"
+    return ".zip"
+
+
+def detect_file_format(content: bytes, tail: Optional[bytes] = None) -> tuple[str, bool]:
+    # ``tail`` is the end of the document when ``content`` is only its head; JSON detection needs both ends.
+    for prefixes, extension in _SIGNATURES_BY_FIRST_BYTE.get(content[:1], ()):
+        if content.startswith(prefixes):
+            if extension == ".zip":
+                return detect_office_format(content), False
+            if extension == ".wav" and len(content) > 12:
+                riff_type = memoryview(content)[8:12]
+                if riff_type == b"WAVE":
+                    return ".wav", False
+                if riff_type == b"AVI ":
+                    return ".avi", False
+                if riff_type == b"WEBP":
+                    return ".webp", False
+                return ".wav", False
+            return extension, False
+
+    # Text heuristics only need the head of the document; decoding the whole upload would double its memory.
+    is_complete = len(content) <= _TEXT_SNIFF_BYTES
+    try:
+        text_content = codecs.getincrementaldecoder("utf-8")().decode(content[:_TEXT_SNIFF_BYTES], final=is_complete)
+    except UnicodeDecodeError:
+        return ".bin", False
+
+    text_stripped = text_content.strip()
+    if not text_stripped:
+        return ".txt", True
+
+    end = content if tail is None else tail
+    if text_stripped.startswith(("{", "[")) and end[-_TAIL_SNIFF_BYTES:].rstrip().endswith((b"}", b"]")):
+        if tail is not None or len(content) > _JSON_VALIDATE_MAX_BYTES:
+            return ".json", True
+        try:
+            json.loads(content)
+            return ".json", True
+        except ValueError:
+            pass
+
+    if text_stripped.startswith("<"):
+        if _HTML_TAG_RE.search(content, 0, _TEXT_SNIFF_BYTES):
+            return ".html", True
+        if text_content[:5].lower() == "<?xml" or "</" in text_content:
+            return ".xml", True
+
+    delimited_format = _detect_delimited_format(content)
+    if delimited_format:
+        return delimited_format, True
+
+    if any(marker in text_content for marker in ["# ", "## ", "### ", "* ", "- ", "1. ", "```", "[", "](", "**", "__"]):
+        return ".md", True
+
+    return ".txt", True
+
+
+def _detect_delimited_format(content: bytes) -> Optional[str]:
+    # Walks at most the first five lines with find() instead of splitting the whole document.
+    comma_counts: set[int] = set()
+    tab_counts: set[int] = set()
+    start = 0
+    for line_number in range(5):
+        end = content.find(b"\n", start)
+        if end == -1:
+            if line_number == 0:
+                return None
+            end = len(content)
+        line = content[start:end]
+        if line.strip():
+            comma_counts.add(line.count(b","))
+            tab_counts.add(line.count(b"\t"))
+        if end == len(content):
+            break
+        start = end + 1
+    if len(comma_counts) == 1 and 0 not in comma_counts:
+        return ".csv"
+    if len(tab_counts) == 1 and 0 not in tab_counts:
+        return ".tsv"
+    return None
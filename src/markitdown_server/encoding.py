@@ -0,0 +1,37 @@
+"""Strict UTF-8 validation for documents that are read or decoded in chunks."""
+import codecs
+
+
+class Utf8Validator:
+    """Runs chunks through a strict incremental UTF-8 decoder and records whether all of them were valid.
+
+    MarkItDown re-guesses the charset and decodes leniently, so text formats are checked here first. ASCII chunks
+    skip the decoder unless it still holds the start of a multi-byte sequence, and validation stops at the first
+    invalid chunk, so a binary document costs at most one failed decode.
+
+    ``blank`` records whether every chunk so far was whitespace, so blank documents of any size are caught in the
+    same pass; it stops scanning at the first chunk with content.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.valid = True
+        self.blank = True
+
+    def update(self, chunk: bytes) -> None:
+        if self.blank:
+            self.blank = chunk.isspace()
+        if not self.valid or (chunk.isascii() and not self._decoder.getstate()[0]):
+            return
+        try:
+            self._decoder.decode(chunk)
+        except UnicodeDecodeError:
+            self.valid = False
+
+    def finish(self) -> bool:
+        if self.valid:
+            try:
+                self._decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                self.valid = False
+        return self.valid
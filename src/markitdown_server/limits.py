@@ -0,0 +1,55 @@
+"""Request size limits enforced before the body reaches FastAPI."""
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from markitdown_server.responses import ORJSONResponse
+
+
+class BodySizeLimitMiddleware:
+    """Rejects request bodies larger than ``max_body_bytes`` with 413.
+
+    A declared Content-Length over the limit is refused before any body is read. Chunked or under-declared bodies
+    are counted as they arrive and cut off as soon as they cross the limit. ``max_body_bytes=0`` disables the check.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.max_body_bytes:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds the {self.max_body_bytes} byte limit"
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_body_bytes:
+            await ORJSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing instead of turning them into a 400.
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as exc:
+            # Reached only when the body was read outside a route (e.g. by the DEBUG body logger).
+            if exc.status_code != 413 or response_started:
+                raise
+            await ORJSONResponse({"detail": exc.detail}, status_code=413)(scope, receive, send)
@@ -86,6 +86,8 @@ def add_request_logging_middleware(app: FastAPI) -> None:
             duration_ms = (time.perf_counter() - started) * 1000
             logger.exception("HTTP request failed method=%s path=%s duration_ms=%.2f", request.method, request.url.path, duration_ms)
             raise
+        if not logger.isEnabledFor(logging.INFO):
+            return response
         duration_ms = (time.perf_counter() - started) * 1000
         logger.info(
             "HTTP request completed method=%s path=%s status_code=%s duration_ms=%.2f",
@@ -105,6 +107,9 @@ async def _read_loggable_body(logger: logging.Logger, request: Request) -> bytes
 
 
 def _log_request_start(logger: logging.Logger, request: Request, body: bytes | None) -> None:
+    # Building the URL and header lookups is wasted work when INFO is filtered out (e.g. LOG_LEVEL=WARNING).
+    if not logger.isEnabledFor(logging.INFO):
+        return
     content_type = request.headers.get("content-type", "")
     content_length = request.headers.get("content-length", str(len(body or b"")))
     logger.info(
@@ -1,31 +1,135 @@
 from __future__ import annotations
 
-import base64
-import json
+import gzip
+import io
 import logging
 import os
-import tempfile
-from typing import Optional
-
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import JSONResponse, PlainTextResponse
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, Optional, TypeVar
+
+import anyio
+import orjson
+from fastapi import FastAPI, File, Header, HTTPException, Request, UploadFile
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.utils import is_body_allowed_for_status_code
 import markitdown_server.extensions
-from markitdown import MarkItDown
+from magika import Magika
+from markitdown import MarkItDown, StreamInfo
+from markitdown_server.cache import ConversionCache, content_hasher
+from markitdown_server.detection import _TAIL_SNIFF_BYTES, detect_file_format
+from markitdown_server.encoding import Utf8Validator
+from markitdown_server.limits import BodySizeLimitMiddleware
 from markitdown_server.logging import add_request_logging_middleware, configure_logging
+from markitdown_server.metrics import MetricsCollector
+from markitdown_server.responses import ORJSONResponse
+from markitdown_server.spool import Base64SpoolWriter, Spool
+from markitdown_server.workers import available_cpus, worker_count
 from pydantic import BaseModel
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 configure_logging()
 LOGGER = logging.getLogger(__name__)
+# 4 MiB of base64 text decodes to 3 MiB; chunk sizes must stay a multiple of 4 characters.
+_BASE64_CHUNK_CHARS = 4 * 1024 * 1024
+_SNIFF_BYTES = 64 * 1024
+_BASE64_WHITESPACE = b" \t\r\n"
+_UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Base64 results longer than this are streamed as JSON in slices instead of being serialized in one piece.
+_STREAM_RESPONSE_MIN_CHARS = 1024 * 1024
+_STREAM_RESPONSE_CHUNK_CHARS = 256 * 1024
+# Per-process defaults below split the machine between the worker processes instead of giving each one all of it.
+_WORKERS = worker_count()
+# Conversions are CPU-bound and synchronous; they run in worker threads, at most this many at once.
+_MAX_CONCURRENT_CONVERSIONS = int(
+    os.getenv("MARKITDOWN_MAX_CONCURRENT_CONVERSIONS") or max(1, available_cpus() // _WORKERS)
+)
+_CONVERSION_LIMITER = anyio.CapacityLimiter(_MAX_CONCURRENT_CONVERSIONS)
+# Identical payloads (client retries, dashboards polling one artifact) are answered without re-running MarkItDown.
+_CONVERSION_CACHE = ConversionCache(
+    max_entries=int(os.getenv("MARKITDOWN_CACHE_ENTRIES") or 512),
+    max_bytes=int(os.getenv("MARKITDOWN_CACHE_MAX_BYTES") or 256 * 1024 * 1024 // _WORKERS),
+)
+METRICS = MetricsCollector()
+# Bodies above this are refused with 413 before they are buffered or spooled; 0 disables the limit.
+_MAX_BODY_BYTES = int(os.getenv("MARKITDOWN_MAX_BODY_BYTES") or 100 * 1024 * 1024)
+# Markdown compresses several-fold; responses at least this large are gzipped for clients that accept it. 0 disables.
+_GZIP_MIN_BYTES = int(os.getenv("MARKITDOWN_GZIP_MIN_BYTES") or 512)
+_SKIP_MD_ROUNDTRIP = os.getenv("MARKITDOWN_SKIP_MD_ROUNDTRIP", "false").lower() in ("true", "1", "yes", "on")
+_MARKDOWN_EXTENSIONS = frozenset({".md", ".markdown"})
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".ico", ".webp", ".tiff"}
+# Detection results weak enough to be overridden by the uploaded filename's extension.
+_HINTABLE_EXTENSIONS = frozenset({".bin", ".txt"})
+# Magika (a small file-type classifier) resolves those weak results when the filename gives no usable hint.
+# One inference costs a few milliseconds, so it never runs for signature or structured-text matches.
+_MAGIKA_FALLBACK = os.getenv("MARKITDOWN_MAGIKA_FALLBACK", "true").lower() in ("true", "1", "yes", "on")
+# Loaded on first use: importers that never sniff uploads, or run with the fallback off, skip the model load.
+_MAGIKA: Optional[Magika] = None
+_MAGIKA_LOCK = threading.Lock()
+# Magika's pick per content digest; entries are a few bytes each, so only the count needs bounding.
+_MAGIKA_RESULTS = ConversionCache(max_entries=4096, max_bytes=4 * 1024 * 1024)
+# Filename extensions MarkItDown has a converter for; anything else is ignored as a hint.
+_VALID_EXT_HINTS = frozenset(
+    {
+        ".pdf", ".docx", ".xlsx", ".xls", ".pptx", ".msg", ".epub", ".zip",
+        ".html", ".htm", ".xhtml", ".xml", ".rss", ".atom", ".ipynb", ".rtf",
+        ".txt", ".text", ".md", ".markdown", ".json", ".jsonl", ".csv", ".tsv",
+        ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".ico", ".webp", ".tiff",
+        ".wav", ".mp3", ".m4a", ".mp4", ".flac", ".ogg",
+    }
+)
+
+_WARMUP_SAMPLES = (
+    (b"# Warm-up\n\nMarkdown sample.", ".md"),
+    (b"<html><body><h1>Warm-up</h1><p>HTML sample.</p></body></html>", ".html"),
+    (b"name,value\nwarm-up,1\n", ".csv"),
+    (b'{"warm_up": true}', ".json"),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Built once per worker before it accepts traffic, so plugin loading is not an import side effect.
+    app.state.markitdown = MarkItDown()
+    _warm_up(app.state.markitdown)
+    yield
+
+
+def _warm_up(converter: MarkItDown) -> None:
+    # First conversions pay for lazy imports and Magika's first inference; take that hit before serving requests.
+    for sample, extension in _WARMUP_SAMPLES:
+        try:
+            converter.convert(io.BytesIO(sample), stream_info=StreamInfo(extension=extension, charset="utf-8"))
+        except Exception:
+            LOGGER.warning("Warm-up conversion failed extension=%s", extension, exc_info=True)
+    if _MAGIKA_FALLBACK:
+        _get_magika().identify_bytes(_WARMUP_SAMPLES[0][0])
+
 
 app = FastAPI(
     title="MarkItDown Server",
     description="FastAPI service that converts documents to markdown using MarkItDown.",
     version="0.2.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
+if _GZIP_MIN_BYTES:
+    # Innermost, so it still sees whole response bodies; the logging middleware re-streams them, which would defeat
+    # minimum_size. zlib's default level: Starlette's level 9 costs several times the CPU for slightly smaller output.
+    app.add_middleware(GZipMiddleware, minimum_size=_GZIP_MIN_BYTES, compresslevel=6)
 add_request_logging_middleware(app)
+app.add_middleware(BodySizeLimitMiddleware, max_body_bytes=_MAX_BODY_BYTES)
 
-markitdown = MarkItDown()
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException) -> Response:
+    # Same contract as FastAPI's default handler, but error bodies go through orjson like every other JSON response.
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=exc.headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
 
 
 class Base64ConvertRequest(BaseModel):
@@ -33,136 +137,185 @@ class Base64ConvertRequest(BaseModel):
     filename: Optional[str] = None
 
 
-def detect_office_format(content: bytes) -> str:
-    content_str = content[:2000].decode("utf-8", errors="ignore").lower()
-    if "word/" in content_str or "document.xml" in content_str:
-        return ".docx"
-    if "xl/" in content_str or "workbook.xml" in content_str:
-        return ".xlsx"
-    if "ppt/" in content_str or "presentation.xml" in content_str:
-        return ".pptx"
-    if "epub" in content_str or "container.xml" in content_str:
-        return ".epub"
-    return ".zip"
-
-
-def detect_file_format(content: bytes) -> tuple[str, bool]:
-    binary_signatures = {
-        b"%PDF": ".pdf",
-        b"PK\x03\x04": ".zip",
-        b"PK\x05\x06": ".zip",
-        b"PK\x07\x08": ".zip",
-        b"\xff\xd8\xff": ".jpg",
-        b"\x89PNG\r\n\x1a\n": ".png",
-        b"GIF8": ".gif",
-        b"BM": ".bmp",
-        b"\x00\x00\x01\x00": ".ico",
-        b"\x00\x00\x02\x00": ".cur",
-        b"RIFF": ".wav",
-        b"ID3": ".mp3",
-        b"\xff\xfb": ".mp3",
-        b"\xff\xf3": ".mp3",
-        b"\xff\xf2": ".mp3",
-        b"ftyp": ".m4a",
-        b"OggS": ".ogg",
-        b"fLaC": ".flac",
-        b"EPUB": ".epub",
-        b"ustar\x20\x20\x00": ".tar",
-        b"ustar\x00": ".tar",
-        b"\x1f\x8b": ".gz",
-        b"BZh": ".bz2",
-        b"\xfd7zXZ\x00": ".xz",
-        b"7z\xbc\xaf\x27\x1c": ".7z",
-        b"Rar!\x1a\x07\x00": ".rar",
-        b"{\\rtf": ".rtf",
-        b"\xff\xe0": ".jpg",
-        b"WEBP": ".webp",
-        b"\x89\x50\x4e\x47\x0d\x0a\x1a\x0a": ".png",
-    }
-
-    for signature, extension in binary_signatures.items():
-        if content.startswith(signature):
-            if extension == ".zip":
-                return detect_office_format(content), False
-            if extension == ".wav" and len(content) > 12:
-                riff_type = content[8:12]
-                if riff_type == b"WAVE":
-                    return ".wav", False
-                if riff_type == b"AVI ":
-                    return ".avi", False
-                if riff_type == b"WEBP":
-                    return ".webp", False
-                return ".wav", False
-            if extension == ".m4a" and len(content) > 8 and content[4:8] == b"ftyp":
-                return ".m4a", False
-            return extension, False
+def _resolve_extension(
+    content: bytes, filename: Optional[str], tail: Optional[bytes] = None, digest: Optional[bytes] = None
+) -> tuple[str, bool]:
+    extension, is_text = detect_file_format(content, tail)
+    return _refine_extension(content, filename, extension, is_text, digest), is_text
+
+
+def _refine_extension(
+    content: bytes, filename: Optional[str], extension: str, is_text: bool, digest: Optional[bytes] = None
+) -> str:
+    # Only weak detection results are refined: first from the filename, then by Magika.
+    if extension not in _HINTABLE_EXTENSIONS:
+        return extension
+    hinted = os.path.splitext(filename)[1].lower() if filename else ""
+    if hinted in _VALID_EXT_HINTS:
+        # The client named a format MarkItDown converts, including .txt itself; that is taken as stated.
+        return hinted
+    if _MAGIKA_FALLBACK:
+        return _identify_with_magika(content, is_text, digest) or extension
+    return extension
+
+
+def _get_magika() -> Magika:
+    global _MAGIKA
+    if _MAGIKA is None:
+        with _MAGIKA_LOCK:
+            if _MAGIKA is None:
+                _MAGIKA = Magika()
+    return _MAGIKA
+
+
+def _identify_with_magika(content: bytes, is_text: bool, digest: Optional[bytes] = None) -> Optional[str]:
+    # Repeated uploads would otherwise pay for an inference before their conversion-cache hit; "" records no match.
+    if digest is not None:
+        cached = _MAGIKA_RESULTS.get((digest, "magika"))
+        if cached is not None:
+            return cached or None
+    extension = _magika_extension(content, is_text)
+    if digest is not None:
+        _MAGIKA_RESULTS.put((digest, "magika"), extension or "")
+    return extension
+
+
+def _magika_extension(content: bytes, is_text: bool) -> Optional[str]:
+    # Only labels of the same text/binary kind are accepted: the UTF-8 validation decision is already made.
+    output = _get_magika().identify_bytes(content).output
+    if output.is_text != is_text:
+        return None
+    for extension in output.extensions:
+        if f".{extension}" in _VALID_EXT_HINTS:
+            return f".{extension}"
+    return None
+
+
+def _convert_upload_to_markdown(
+    upload: BinaryIO, filename: Optional[str] = None, if_none_match: Optional[str] = None
+) -> tuple[str, str]:
+    size = upload.seek(0, io.SEEK_END)
+    if not size:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+    upload.seek(max(0, size - _TAIL_SNIFF_BYTES))
+    tail = upload.read() if size > _SNIFF_BYTES else None
+    upload.seek(0)
+    header = upload.read(_SNIFF_BYTES)
+    extension, is_text = detect_file_format(header, tail)
+
+    # One pass over the upload builds the cache key and, for text, strictly validates UTF-8. Reading in slices
+    # bounds the throwaway str the decoder builds.
+    hasher = content_hasher()
+    validator = Utf8Validator() if is_text else None
+    chunk = header
+    while chunk:
+        hasher.update(chunk)
+        if validator is not None:
+            validator.update(chunk)
+            if not validator.valid:
+                break
+        chunk = upload.read(_UPLOAD_CHUNK_BYTES)
+    if validator is not None and not validator.finish():
+        raise HTTPException(status_code=400, detail="Invalid text encoding for detected text format")
+    if validator is not None and validator.blank:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
-    try:
-        text_content = content.decode("utf-8")
-        text_stripped = text_content.strip()
-        if not text_stripped:
-            return ".txt", True
+    digest = hasher.digest()
+    extension = _refine_extension(header, filename, extension, is_text, digest)
+    etag = _conversion_etag(digest, extension)
+    if if_none_match and _etag_matches(if_none_match, etag):
+        # The client already holds the markdown for these bytes; MarkItDown is not run even on a cache miss.
+        # 304 is reserved for GET and HEAD, so a failed If-None-Match on this POST is a 412 (RFC 9110, 13.1.2).
+        raise HTTPException(
+            status_code=412, detail="Document unchanged: If-None-Match matches its ETag", headers={"ETag": etag}
+        )
+    # For text the charset is already known, which lets MarkItDown skip its own detection pass.
+    return _convert_cached(upload, digest, extension, size, charset="utf-8" if is_text else None), etag
+
+
+def _conversion_etag(digest: bytes, extension: str) -> str:
+    # Same inputs as the conversion cache key: identical bytes resolved to the same format yield the same markdown.
+    # Weak, because the gzip middleware may send the same markdown under a different content coding.
+    return f'W/"{digest.hex()}{extension}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: the W/ prefix is ignored on both sides. "*" is not honored: every upload has a conversion,
+    # so it would short-circuit any document the client sends.
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _convert_base64_to_markdown(encoded: str, filename: Optional[str] = None) -> str:
+    if len(encoded) & 3:
+        # Fail fast before decoding anything; a truncated payload would otherwise only surface at its last chunk.
+        raise HTTPException(status_code=400, detail="Invalid base64 content: length is not a multiple of 4")
+
+    # Decodes slice by slice into a spool so the full decoded payload is never held in memory at once.
+    with Spool() as spool:
+        writer = Base64SpoolWriter(spool, _SNIFF_BYTES, _TAIL_SNIFF_BYTES)
+        try:
+            for offset in range(0, len(encoded), _BASE64_CHUNK_CHARS):
+                # Encoding slice by slice bounds the ASCII copy; non-ASCII text fails here as invalid base64.
+                writer.write(encoded[offset : offset + _BASE64_CHUNK_CHARS].encode("ascii"))
+            writer.close()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid base64 content: {exc}") from exc
+        return _convert_spool_to_markdown(spool, writer, filename)
+
+
+def _convert_spool_to_markdown(spool: Spool, writer: Base64SpoolWriter, filename: Optional[str]) -> str:
+    if not writer.decoded_size:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
 
-        if text_stripped.startswith(("{", "[")) and text_stripped.endswith(("}", "]")):
-            try:
-                json.loads(text_content)
-                return ".json", True
-            except ValueError:
-                pass
-
-        if text_stripped.startswith("<"):
-            lowered = text_content.lower()
-            if any(tag in lowered for tag in ["<html", "<head", "<body", "<div", "<p", "<span"]):
-                return ".html", True
-            if lowered.startswith("<?xml") or "</" in text_content:
-                return ".xml", True
-
-        lines = text_content.split("\n")[:5]
-        if len(lines) > 1:
-            comma_counts = [line.count(",") for line in lines if line.strip()]
-            if comma_counts and len(set(comma_counts)) == 1 and comma_counts[0] > 0:
-                return ".csv", True
-            tab_counts = [line.count("\t") for line in lines if line.strip()]
-            if tab_counts and len(set(tab_counts)) == 1 and tab_counts[0] > 0:
-                return ".tsv", True
-
-        if any(marker in text_content for marker in ["# ", "## ", "### ", "* ", "- ", "1. ", "```", "[", "](", "**", "__"]):
-            return ".md", True
-
-        return ".txt", True
-    except UnicodeDecodeError:
-        return ".bin", False
-
-
-def _convert_bytes_to_markdown(file_bytes: bytes, filename: Optional[str] = None) -> str:
-    if not file_bytes:
+    LOGGER.info(
+        "Received base64 document filename=%s encoded_chars=%d decoded_bytes=%d",
+        filename,
+        writer.encoded_size,
+        writer.decoded_size,
+    )
+    header = writer.header
+    # Same inputs as an upload: the tail only matters once the head no longer covers the whole document.
+    tail = writer.tail if writer.decoded_size > len(header) else None
+    extension, is_text = detect_file_format(header, tail)
+    if is_text and writer.is_blank:
         raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+    if is_text and not writer.is_utf8:
+        raise HTTPException(status_code=400, detail="Invalid text encoding for detected text format")
+    extension = _refine_extension(header, filename, extension, is_text, writer.digest)
+    return _convert_cached(
+        spool.file, writer.digest, extension, writer.decoded_size, charset="utf-8" if is_text else None
+    )
 
-    extension, is_text = detect_file_format(file_bytes)
-    if filename and "." in filename:
-        hinted = "." + filename.rsplit(".", 1)[1].lower()
-        if extension in {".bin", ".txt"}:
-            extension = hinted
 
-    temp_file_path = None
+def _convert_cached(source: BinaryIO, digest: bytes, extension: str, size: int, charset: Optional[str] = None) -> str:
+    started = time.perf_counter_ns()
+    cache_key = (digest, extension)
+    markdown = _CONVERSION_CACHE.get(cache_key)
+    cache_hit = markdown is not None
+    if markdown is None:
+        source.seek(0)
+        try:
+            markdown = _convert_source_to_markdown(source, extension, charset)
+        except HTTPException:
+            METRICS.record_failure(extension)
+            raise
+        _CONVERSION_CACHE.put(cache_key, markdown)
+    METRICS.record(extension, size, len(markdown), time.perf_counter_ns() - started, cache_hit)
+    return markdown
+
+
+def _convert_source_to_markdown(source: BinaryIO, extension: str, charset: Optional[str] = None) -> str:
     try:
-        if is_text:
+        if _SKIP_MD_ROUNDTRIP and extension in _MARKDOWN_EXTENSIONS:
+            # Markdown is already the target format; MarkItDown would only decode and return it unchanged.
             try:
-                text_content = file_bytes.decode("utf-8")
+                markdown = source.read().decode("utf-8").strip()
             except UnicodeDecodeError as exc:
                 raise HTTPException(status_code=400, detail="Invalid text encoding for detected text format") from exc
-            if not text_content.strip():
-                raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-            with tempfile.NamedTemporaryFile(mode="w", suffix=extension, delete=False, encoding="utf-8") as temp_file:
-                temp_file.write(text_content)
-                temp_file_path = temp_file.name
         else:
-            with tempfile.NamedTemporaryFile(mode="wb", suffix=extension, delete=False) as temp_file:
-                temp_file.write(file_bytes)
-                temp_file_path = temp_file.name
-
-        result = markitdown.convert(temp_file_path)
-        markdown = (result.text_content or "").strip()
+            result = app.state.markitdown.convert(source, stream_info=StreamInfo(extension=extension, charset=charset))
+            markdown = (result.text_content or "").strip()
         if markdown:
             return markdown
 
@@ -184,17 +337,28 @@ def _convert_bytes_to_markdown(file_bytes: bytes, filename: Optional[str] = None
         if "not supported" in message.lower() or "UnsupportedFormatException" in message:
             raise HTTPException(status_code=400, detail=f"Conversion failed: {message}") from exc
         raise HTTPException(status_code=500, detail=f"Failed to convert document: {message}") from exc
-    finally:
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-            except OSError:
-                LOGGER.warning("Unable to remove temporary file: %s", temp_file_path)
+
+
+_T = TypeVar("_T")
+
+
+async def _run_conversion(convert: Callable[..., _T], *args: object) -> _T:
+    # Keeps the event loop free while MarkItDown works; HTTPExceptions raised in the thread propagate unchanged.
+    return await anyio.to_thread.run_sync(convert, *args, limiter=_CONVERSION_LIMITER)
+
+
+_HEALTH_BYTES = orjson.dumps({"status": "ok"})
 
 
 @app.get("/health", tags=["system"])
-async def health() -> dict[str, str]:
-    return {"status": "ok"}
+async def health() -> Response:
+    # Hit by the container HEALTHCHECK and orchestrator probes, so it only hands back prebuilt bytes.
+    return Response(content=_HEALTH_BYTES, media_type="application/json")
+
+
+@app.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.post(
@@ -204,36 +368,62 @@ async def health() -> dict[str, str]:
     summary="Convert a document to Markdown",
     response_description="Markdown representation of the uploaded document.",
 )
-async def convert_document(file: UploadFile = File(...)) -> PlainTextResponse:
-    data = await file.read()
+async def convert_document(
+    file: UploadFile = File(...), if_none_match: Optional[str] = Header(default=None)
+) -> PlainTextResponse:
     LOGGER.info(
-        "Received uploaded document filename=%s content_type=%s size_bytes=%d",
+        "Received uploaded document filename=%s content_type=%s size_bytes=%s",
         file.filename,
         file.content_type,
-        len(data),
+        file.size,
     )
-    markdown = _convert_bytes_to_markdown(data, file.filename)
-    return PlainTextResponse(content=markdown, media_type="text/markdown; charset=utf-8")
+    # Starlette has already spooled the upload; MarkItDown reads it from there rather than from a full in-memory copy.
+    # The buffered wrapper gives MarkItDown the BufferedIOBase its content sniffing requires.
+    upload = io.BufferedReader(file.file)  # type: ignore[arg-type]
+    markdown, etag = await _run_conversion(_convert_upload_to_markdown, upload, file.filename, if_none_match)
+    return PlainTextResponse(content=markdown, media_type="text/markdown; charset=utf-8", headers={"ETag": etag})
 
 
-@app.get("/")
-async def root() -> dict[str, object]:
-    return {
+# Static documents, serialized once at import so each request only hands back the same bytes.
+_ROOT_BYTES = orjson.dumps(
+    {
         "message": "MarkItDown Server is running",
         "status": "healthy",
         "endpoints": {
             "health": "GET /health - Readiness probe",
             "convert": "POST /convert - Upload document using multipart/form-data field 'file'",
             "convert_base64": "POST /convert-base64 - Upload base64-encoded file content",
+            "convert_batch": "POST /convert-batch - Convert a JSON array of base64 documents in one request",
             "formats": "GET /formats - List supported file formats",
+            "metrics": "GET /metrics - Conversion metrics in Prometheus text format",
         },
         "version": "0.2.0",
     }
+)
 
 
-@app.get("/formats")
-async def supported_formats() -> dict[str, object]:
-    return {
+_ROOT_GZIP_BYTES = gzip.compress(_ROOT_BYTES, compresslevel=9, mtime=0)
+
+
+def _static_json_response(request: Request, body: bytes, gzip_body: bytes) -> Response:
+    # Static documents are compressed once at import. A response that already carries Content-Encoding is passed
+    # through by the gzip middleware, so these bodies are never compressed again per request.
+    if _GZIP_MIN_BYTES and len(body) >= _GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=gzip_body,
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(content=body, media_type="application/json", headers={"Vary": "Accept-Encoding"})
+
+
+@app.get("/")
+async def root(request: Request) -> Response:
+    return _static_json_response(request, _ROOT_BYTES, _ROOT_GZIP_BYTES)
+
+
+_FORMATS_BYTES = orjson.dumps(
+    {
         "detection_capabilities": {
             "description": "Formats the server can automatically detect from file content",
             "total_detectable": 32,
@@ -262,39 +452,126 @@ async def supported_formats() -> dict[str, object]:
             },
         },
     }
+)
+
+
+_FORMATS_GZIP_BYTES = gzip.compress(_FORMATS_BYTES, compresslevel=9, mtime=0)
+
+
+@app.get("/formats")
+async def supported_formats(request: Request) -> Response:
+    return _static_json_response(request, _FORMATS_BYTES, _FORMATS_GZIP_BYTES)
 
 
 @app.post("/convert-base64")
-async def convert_base64_document(request: Base64ConvertRequest) -> JSONResponse:
+async def convert_base64_document(request: Base64ConvertRequest) -> Response:
     if not request.content:
         raise HTTPException(status_code=400, detail="No base64 content provided")
-    try:
-        raw_content = base64.b64decode(request.content, validate=True)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=f"Invalid base64 content: {exc}") from exc
-
-    LOGGER.info(
-        "Received base64 document filename=%s encoded_chars=%d decoded_bytes=%d",
-        request.filename,
-        len(request.content),
-        len(raw_content),
-    )
-    markdown = _convert_bytes_to_markdown(raw_content, request.filename)
-    return JSONResponse(
+    markdown = await _run_conversion(_convert_base64_to_markdown, request.content, request.filename)
+    return _base64_conversion_response(request.filename, markdown)
+
+
+@app.post("/convert-base64-stream")
+async def convert_base64_stream(request: Request, filename: Optional[str] = None) -> Response:
+    # The body is raw base64 text, decoded as it arrives; line breaks from wrapped encoders are ignored.
+    with Spool() as spool:
+        writer = Base64SpoolWriter(spool, _SNIFF_BYTES, _TAIL_SNIFF_BYTES)
+        batch = bytearray()
+        try:
+            async for chunk in request.stream():
+                batch += chunk.translate(None, _BASE64_WHITESPACE)
+                if len(batch) >= _BASE64_CHUNK_CHARS:
+                    # Decoding and spilling megabytes at a time would otherwise stall every connection on this loop.
+                    await anyio.to_thread.run_sync(writer.write, batch)
+                    batch = bytearray()
+            if batch:
+                await anyio.to_thread.run_sync(writer.write, batch)
+            writer.close()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid base64 content: {exc}") from exc
+        markdown = await _run_conversion(_convert_spool_to_markdown, spool, writer, filename)
+    return _base64_conversion_response(filename, markdown)
+
+
+@app.post("/convert-batch")
+async def convert_base64_batch(requests: list[Base64ConvertRequest]) -> Response:
+    if not requests:
+        raise HTTPException(status_code=400, detail="No documents provided")
+    # One worker-thread hop for the whole batch; small documents cost less to convert than to dispatch.
+    results = await _run_conversion(_convert_base64_batch, requests)
+    return ORJSONResponse(status_code=200, content=results)
+
+
+def _convert_base64_batch(requests: list[Base64ConvertRequest]) -> list[dict[str, object]]:
+    # A failed document is reported in its slot instead of failing the documents around it.
+    results: list[dict[str, object]] = []
+    for request in requests:
+        try:
+            if not request.content:
+                raise HTTPException(status_code=400, detail="No base64 content provided")
+            markdown = _convert_base64_to_markdown(request.content, request.filename)
+        except HTTPException as exc:
+            results.append(
+                {
+                    "success": False,
+                    "original_filename": request.filename,
+                    "status_code": exc.status_code,
+                    "detail": exc.detail,
+                }
+            )
+            continue
+        results.append(
+            {
+                "success": True,
+                "original_filename": request.filename,
+                "converted_content": markdown,
+                "converted_length": len(markdown),
+            }
+        )
+    return results
+
+
+def _base64_conversion_response(filename: Optional[str], markdown: str) -> Response:
+    if len(markdown) > _STREAM_RESPONSE_MIN_CHARS:
+        return StreamingResponse(_iter_base64_conversion_json(filename, markdown), media_type="application/json")
+    return ORJSONResponse(
         status_code=200,
         content={
             "success": True,
-            "original_filename": request.filename,
+            "original_filename": filename,
             "converted_content": markdown,
             "converted_length": len(markdown),
         },
     )
 
 
+def _iter_base64_conversion_json(filename: Optional[str], markdown: str) -> Iterator[bytes]:
+    # Same document as the ORJSONResponse branch, but converted_content is escaped slice by slice so a large result
+    # never exists a second time as one encoded bytes object. JSON escaping is per character, so slices concatenate.
+    yield b'{"success":true,"original_filename":' + orjson.dumps(filename) + b',"converted_content":"'
+    for offset in range(0, len(markdown), _STREAM_RESPONSE_CHUNK_CHARS):
+        yield orjson.dumps(markdown[offset : offset + _STREAM_RESPONSE_CHUNK_CHARS])[1:-1]
+    yield b'","converted_length":%d}' % len(markdown)
+
+
 def run() -> None:
     import uvicorn
 
-    uvicorn.run("markitdown_server.main:app", host="0.0.0.0", port=8000, reload=False)
+    # Conversions are CPU-bound, so one process per usable core; each worker builds its own MarkItDown in the lifespan.
+    # Exported so the spawned workers size their limiter and cache for the same count.
+    workers = int(os.getenv("WEB_CONCURRENCY") or available_cpus())
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    # uvloop and httptools come with uvicorn[standard]; naming them fails fast if a build lost them instead of
+    # silently falling back to asyncio's selector loop and h11. uvloop has no Windows build, so there uvicorn picks.
+    uvicorn.run(
+        "markitdown_server.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=False,
+        workers=workers,
+        loop="uvloop" if sys.platform != "win32" else "auto",
+        http="httptools",
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,88 @@
+"""Conversion metrics exposed in the Prometheus text format."""
+import os
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+# Upper bounds (seconds) of the conversion latency histogram; the implicit last bucket is +Inf.
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class MetricsCollector:
+    """Per-format conversion counters and latency histograms.
+
+    Conversions finish in worker threads, so updates are grouped under one short lock; rendering takes a
+    consistent snapshot under the same lock.
+
+    Counts are per process. Every series carries a ``pid`` label, so a scrape answered by another uvicorn worker
+    shows up as a different series instead of an apparent counter reset; sum over ``pid`` for service totals.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._conversions: Counter[tuple[str, str]] = Counter()
+        self._failures: Counter[str] = Counter()
+        self._input_bytes: Counter[str] = Counter()
+        self._output_chars: Counter[str] = Counter()
+        self._latency_buckets: dict[str, list[int]] = {}
+        self._latency_sum_ns: Counter[str] = Counter()
+
+    def record(self, extension: str, input_bytes: int, output_chars: int, duration_ns: int, cache_hit: bool) -> None:
+        fmt = extension.lstrip(".") or "unknown"
+        bucket = bisect_left(LATENCY_BUCKETS_SECONDS, duration_ns / 1e9)
+        with self._lock:
+            self._conversions[fmt, "hit" if cache_hit else "miss"] += 1
+            self._input_bytes[fmt] += input_bytes
+            self._output_chars[fmt] += output_chars
+            buckets = self._latency_buckets.get(fmt)
+            if buckets is None:
+                buckets = self._latency_buckets[fmt] = [0] * (len(LATENCY_BUCKETS_SECONDS) + 1)
+            buckets[bucket] += 1
+            self._latency_sum_ns[fmt] += duration_ns
+
+    def record_failure(self, extension: str) -> None:
+        with self._lock:
+            self._failures[extension.lstrip(".") or "unknown"] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            conversions = dict(self._conversions)
+            failures = dict(self._failures)
+            input_bytes = dict(self._input_bytes)
+            output_chars = dict(self._output_chars)
+            latency_buckets = {fmt: list(counts) for fmt, counts in self._latency_buckets.items()}
+            latency_sum_ns = dict(self._latency_sum_ns)
+        pid = f'pid="{os.getpid()}"'
+
+        lines = [
+            "# HELP markitdown_conversions_total Completed conversions by detected format and cache outcome.",
+            "# TYPE markitdown_conversions_total counter",
+        ]
+        lines += [f'markitdown_conversions_total{{format="{fmt}",cache="{cache}",{pid}}} {count}' for (fmt, cache), count in sorted(conversions.items())]
+        lines += [
+            "# HELP markitdown_conversion_failures_total Conversions rejected or failed by detected format.",
+            "# TYPE markitdown_conversion_failures_total counter",
+        ]
+        lines += [f'markitdown_conversion_failures_total{{format="{fmt}",{pid}}} {count}' for fmt, count in sorted(failures.items())]
+        lines += [
+            "# HELP markitdown_input_bytes_total Decoded document bytes converted, by detected format.",
+            "# TYPE markitdown_input_bytes_total counter",
+        ]
+        lines += [f'markitdown_input_bytes_total{{format="{fmt}",{pid}}} {total}' for fmt, total in sorted(input_bytes.items())]
+        lines += [
+            "# HELP markitdown_output_chars_total Markdown characters produced, by detected format.",
+            "# TYPE markitdown_output_chars_total counter",
+        ]
+        lines += [f'markitdown_output_chars_total{{format="{fmt}",{pid}}} {total}' for fmt, total in sorted(output_chars.items())]
+        lines += [
+            "# HELP markitdown_conversion_duration_seconds Time spent producing markdown, cache hits included.",
+            "# TYPE markitdown_conversion_duration_seconds histogram",
+        ]
+        for fmt, counts in sorted(latency_buckets.items()):
+            cumulative = 0
+            for upper, count in zip((*LATENCY_BUCKETS_SECONDS, "+Inf"), counts):
+                cumulative += count
+                lines.append(f'markitdown_conversion_duration_seconds_bucket{{format="{fmt}",le="{upper}",{pid}}} {cumulative}')
+            lines.append(f'markitdown_conversion_duration_seconds_sum{{format="{fmt}",{pid}}} {latency_sum_ns[fmt] / 1e9}')
+            lines.append(f'markitdown_conversion_duration_seconds_count{{format="{fmt}",{pid}}} {cumulative}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,165 @@
+"""Spooling helpers for uploads that are decoded incrementally."""
+import binascii
+import io
+import os
+import tempfile
+import threading
+from typing import BinaryIO
+
+import pybase64
+
+from markitdown_server.cache import content_hasher
+from markitdown_server.encoding import Utf8Validator
+
+# Payloads up to this size never touch the disk; larger ones roll over to an anonymous temp file.
+SPOOL_MAX_MEMORY_BYTES = 1024 * 1024
+
+
+def _resolve_spool_dir() -> str | None:
+    # None means tempfile's default directory. tmpfs such as /dev/shm is opt-in: Docker sizes it at 64 MB by default
+    # and it counts against the container's memory limit, so a large rollover could fail with ENOSPC.
+    return os.getenv("MARKITDOWN_TMPDIR") or None
+
+
+SPOOL_DIR = _resolve_spool_dir()
+
+
+class TempFilePool:
+    """LIFO pool of anonymous temp files that are truncated and rewound instead of being closed.
+
+    Reusing descriptors keeps file creation and unlinking off the request path. Once ``max_size`` files are idle,
+    further releases simply close the file.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._files: list[BinaryIO] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> BinaryIO:
+        with self._lock:
+            if self._files:
+                return self._files.pop()
+        return tempfile.TemporaryFile(dir=SPOOL_DIR)
+
+    def release(self, file: BinaryIO) -> None:
+        try:
+            file.seek(0)
+            file.truncate()
+        except (OSError, ValueError):
+            file.close()
+            return
+        with self._lock:
+            if len(self._files) < self.max_size:
+                self._files.append(file)
+                return
+        file.close()
+
+
+TEMP_FILE_POOL = TempFilePool(max_size=8)
+
+
+class Spool:
+    """Binary buffer kept in memory until it outgrows SPOOL_MAX_MEMORY_BYTES, then moved to a temp file.
+
+    Unlike ``tempfile.SpooledTemporaryFile`` the underlying ``file`` is always a real ``BufferedIOBase``,
+    which MarkItDown's content sniffing (Magika) requires.
+    """
+
+    def __init__(self) -> None:
+        self.file: BinaryIO = io.BytesIO()
+        self._in_memory = True
+
+    def __enter__(self) -> "Spool":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._in_memory:
+            self.file.close()
+        else:
+            TEMP_FILE_POOL.release(self.file)
+
+    def write(self, data: bytes) -> None:
+        if self._in_memory and self.file.tell() + len(data) > SPOOL_MAX_MEMORY_BYTES:
+            self._rollover()
+        self.file.write(data)
+
+    def rewind(self) -> BinaryIO:
+        self.file.seek(0)
+        return self.file
+
+    def _rollover(self) -> None:
+        buffer = self.file
+        self.file = TEMP_FILE_POOL.acquire()
+        self.file.write(buffer.getbuffer())  # type: ignore[attr-defined]
+        buffer.close()
+        self._in_memory = False
+
+
+class Base64SpoolWriter:
+    """Decodes base64 text fed in arbitrary pieces into a binary spool.
+
+    The first ``header_size`` and last ``tail_size`` decoded bytes are also kept in memory for format sniffing,
+    and the decoded stream is hashed as it goes so the result can be looked up in the conversion cache. It is also
+    checked as UTF-8 on the way through, because whether it is text is only known once the header has been sniffed.
+    """
+
+    def __init__(self, spool: Spool, header_size: int, tail_size: int = 0) -> None:
+        self._spool = spool
+        self._header_size = header_size
+        self._header = bytearray()
+        self._tail_size = tail_size
+        self._tail = b""
+        self._pending = b""
+        self._padded = False
+        self._hasher = content_hasher()
+        self._utf8 = Utf8Validator()
+        self.encoded_size = 0
+        self.decoded_size = 0
+
+    @property
+    def header(self) -> bytes:
+        return bytes(self._header)
+
+    @property
+    def tail(self) -> bytes:
+        return self._tail
+
+    @property
+    def digest(self) -> bytes:
+        return self._hasher.digest()
+
+    @property
+    def is_utf8(self) -> bool:
+        return self._utf8.valid
+
+    @property
+    def is_blank(self) -> bool:
+        return self._utf8.blank
+
+    def write(self, encoded: bytes | bytearray | memoryview) -> None:
+        self.encoded_size += len(encoded)
+        if self._pending:
+            encoded = self._pending + encoded
+        # Only whole 4-character quanta can be decoded; the remainder waits for the next piece.
+        usable = len(encoded) - len(encoded) % 4
+        self._pending = bytes(encoded[usable:])
+        if not usable:
+            return
+        if self._padded:
+            raise binascii.Error("padding found before end of data")
+        decoded = pybase64.b64decode(encoded[:usable], validate=True)
+        self._padded = encoded[usable - 1] == 0x3D  # "="
+        if len(self._header) < self._header_size:
+            self._header += decoded[: self._header_size - len(self._header)]
+        if self._tail_size:
+            self._tail = (self._tail + decoded[-self._tail_size :])[-self._tail_size :]
+        self._spool.write(decoded)
+        self._hasher.update(decoded)
+        self._utf8.update(decoded)
+        self.decoded_size += len(decoded)
+
+    def close(self) -> None:
+        if self._pending:
+            raise binascii.Error("length is not a multiple of 4")
+        self._utf8.finish()
@@ -0,0 +1,33 @@
+"""CPU and worker-process sizing shared by the app and its launchers."""
+import math
+import os
+
+_CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def available_cpus(cpu_max_path: str = _CGROUP_CPU_MAX) -> int:
+    """CPUs this process can actually use: its affinity mask, capped by a cgroup v2 CPU quota when one is set.
+
+    ``os.cpu_count()`` reports the host's cores, which overstates a container limited with ``--cpus``.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open(cpu_max_path, encoding="ascii") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota == "max":
+            return cpus
+        return max(1, min(cpus, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        return cpus
+
+
+def worker_count() -> int:
+    """Worker processes serving the app on this host.
+
+    uvicorn takes its default ``--workers`` from ``WEB_CONCURRENCY`` and ``run()`` exports it, so without it
+    exactly one process is serving.
+    """
+    return max(1, int(os.getenv("WEB_CONCURRENCY") or 1))
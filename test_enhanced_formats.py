@@ -4,45 +4,26 @@ Practical test suite for enhanced MarkItDown server format support.
 Tests with realistic content that MarkItDown can actually process.
 """
 
-import requests
-import json
+import asyncio
+import io
+import mimetypes
+import sys
+import threading
+from contextlib import redirect_stdout
+import httpx
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
-# Server configuration
-BASE_URL = "http://localhost:8000"
+from markitdown_server.detection import detect_file_format
+from script_client import BASE_URL, CLIENT, PREVIEW_TABLE, TIMEOUT, VERBOSE
 
-def test_server_health():
-    """Test that the server is running"""
-    try:
-        response = requests.get(f"{BASE_URL}/")
-        return response.status_code == 200
-    except requests.exceptions.ConnectionError:
-        return False
-
-def test_formats_endpoint():
-    """Test the new /formats endpoint"""
-    print("🔍 Testing enhanced formats endpoint...")
-    response = requests.get(f"{BASE_URL}/formats")
-    assert response.status_code == 200
-    
-    data = response.json()
-    print("✅ Enhanced format support includes:")
-    for category, formats in data["supported_formats"].items():
-        print(f"   📁 {category.title()}: {', '.join(formats)}")
-    print()
-    
-    return data
-
-def test_text_formats():
-    """Test enhanced text format detection and processing"""
-    print("📝 Testing enhanced text format support...\n")
-    
-    test_cases = [
-        {
-            "name": "Valid JSON",
-            "content": b'''
-{
+# Text format samples: (content, expected format, name)
+TEXT_FORMAT_CASES: tuple[tuple[bytes, str, str], ...] = (
+    (
+        b'''{
     "name": "MarkItDown Test",
     "version": "1.1.0",
     "features": ["PDF", "DOCX", "CSV", "JSON", "XML"],
@@ -50,13 +31,12 @@ def test_text_formats():
         "created": "2024-01-01",
         "enhanced": true
     }
-}
-'''.strip(),
-            "expected_format": "json"
-        },
-        {
-            "name": "XML Document", 
-            "content": b'''<?xml version="1.0" encoding="UTF-8"?>
+}''',
+        "json",
+        "Valid JSON",
+    ),
+    (
+        b'''<?xml version="1.0" encoding="UTF-8"?>
 <document>
     <title>Enhanced MarkItDown Server</title>
     <features>
@@ -65,11 +45,11 @@ def test_text_formats():
         <feature name="Text formats">CSV, JSON, XML, HTML processing</feature>
     </features>
 </document>''',
-            "expected_format": "xml"
-        },
-        {
-            "name": "HTML Document",
-            "content": b'''<!DOCTYPE html>
+        "xml",
+        "XML Document",
+    ),
+    (
+        b'''<!DOCTYPE html>
 <html>
 <head>
     <title>MarkItDown Test Page</title>
@@ -85,29 +65,29 @@ def test_text_formats():
     </ul>
 </body>
 </html>''',
-            "expected_format": "html"
-        },
-        {
-            "name": "CSV Data",
-            "content": b'''Product,Category,Price,Stock
+        "html",
+        "HTML Document",
+    ),
+    (
+        b'''Product,Category,Price,Stock
 Laptop,Electronics,999.99,50
 Mouse,Electronics,29.99,200
 Keyboard,Electronics,79.99,150
 Monitor,Electronics,299.99,75
 Desk,Furniture,199.99,25''',
-            "expected_format": "csv"
-        },
-        {
-            "name": "TSV Data", 
-            "content": b'''Name\tAge\tCity\tCountry
+        "csv",
+        "CSV Data",
+    ),
+    (
+        b'''Name\tAge\tCity\tCountry
 John Doe\t30\tNew York\tUSA
 Jane Smith\t28\tLondon\tUK
 Bob Johnson\t35\tToronto\tCanada''',
-            "expected_format": "tsv"
-        },
-        {
-            "name": "Markdown Document",
-            "content": b'''# Enhanced MarkItDown Server
+        "tsv",
+        "TSV Data",
+    ),
+    (
+        b'''# Enhanced MarkItDown Server
 
 ## New Features
 
@@ -132,61 +112,149 @@ The server now includes **comprehensive format detection**:
 
 [GitHub Repository](https://github.com/microsoft/markitdown)
 ''',
-            "expected_format": "md"
-        }
-    ]
+        "md",
+        "Markdown Document",
+    ),
+)
+
+@dataclass(slots=True, frozen=True)
+class CaseResult:
+    """Outcome of one text sample or file upload"""
+    name: str
+    success: bool
+    detected: str = ""
+    expected: str = ""
+    error: str = ""
+    size: int = 0
+
+class ThreadBufferedStdout:
+    """sys.stdout stand-in that sends each worker thread's prints to that thread's own buffer"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+    
+    def write(self, text):
+        return getattr(self.local, "buffer", self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+def run_suites_concurrently(*suites):
+    """Run independent suites in threads; each suite's output is printed whole, in order, once all finish.
+    
+    A suite that raises is reported in its own output and yields None, so the other suites still run to completion.
+    """
+    stdout = ThreadBufferedStdout(sys.stdout)
+    
+    def run(suite):
+        stdout.local.buffer = io.StringIO()
+        try:
+            return suite(), stdout.local.buffer.getvalue()
+        except Exception as e:
+            print(f"❌ Suite failed: {type(e).__name__}: {e}")
+            print()
+            return None, stdout.local.buffer.getvalue()
+        except BaseException:
+            sys.__stdout__.write(stdout.local.buffer.getvalue())
+            raise
+    
+    # The suites share CLIENT; httpx.Client is thread-safe.
+    with redirect_stdout(stdout), ThreadPoolExecutor(max_workers=len(suites)) as pool:
+        outcomes = list(pool.map(run, suites))
     
     results = []
-    for test_case in test_cases:
-        print(f"🧪 Testing {test_case['name']}...")
+    for result, output in outcomes:
+        sys.stdout.write(output)
+        results.append(result)
+    sys.stdout.flush()
+    return results
+
+def test_server_health():
+    """Test that the server is running"""
+    try:
+        response = CLIENT.get("/")
+        return response.status_code == 200
+    except httpx.ConnectError:
+        return False
+
+def test_formats_endpoint():
+    """Test the new /formats endpoint"""
+    print("🔍 Testing enhanced formats endpoint...")
+    response = CLIENT.get("/formats")
+    assert response.status_code == 200
+    
+    data = orjson.loads(response.content)
+    detection = data["detection_capabilities"]
+    conversion = data["conversion_support"]
+    print(f"✅ Enhanced format detection covers {detection['total_detectable']} formats:")
+    for category, formats in detection["categories"].items():
+        print(f"   📁 {category.title()}: {', '.join(formats)}")
+    print("✅ Converted to markdown:")
+    for category, formats in conversion["fully_supported"].items():
+        print(f"   📁 {category.title()}: {', '.join(formats)}")
+    print(f"   ℹ️  Detection only: {', '.join(conversion['detection_only']['formats'])}")
+    print()
+    
+    return data
+
+async def test_text_formats():
+    """Test enhanced text format detection and processing"""
+    print("📝 Testing enhanced text format support...\n")
+    
+    # The cases are independent, so post them all at once over a small keep-alive pool.
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        timeout=TIMEOUT,
+    ) as client:
+        responses = await asyncio.gather(
+            *(
+                # No extension on the filename, so the server has to detect the format from the content.
+                client.post("/convert", files={"file": ("sample", content, "application/octet-stream")})
+                for content, _, _ in TEXT_FORMAT_CASES
+            ),
+            return_exceptions=True
+        )
+    
+    results = []
+    for (content, expected_format, name), response in zip(TEXT_FORMAT_CASES, responses):
+        print(f"🧪 Testing {name}...")
         
-        try:
-            response = requests.post(
-                f"{BASE_URL}/convert",
-                data=test_case["content"],
-                headers={"Content-Type": "application/octet-stream"}
-            )
+        if isinstance(response, Exception):
+            print(f"   ❌ Error: {response}")
+            print()
+            results.append(CaseResult(name, False, expected=expected_format, error=str(response)))
+        elif response.status_code == 200:
+            # /convert returns only the markdown, so the format is sniffed here with the server's detector.
+            markdown = response.text
+            detected = detect_file_format(content)[0].lstrip(".")
+            success = detected == expected_format
             
-            if response.status_code == 200:
-                result = response.json()
-                detected = result.get("detected_format", "unknown")
-                success = detected == test_case["expected_format"]
-                
-                print(f"   ✅ Detected: {detected} (Expected: {test_case['expected_format']})")
-                print(f"   📏 {result['original_length']} bytes → {result['converted_length']} chars")
-                
-                # Show a preview of the conversion
-                content_preview = result['converted_content'][:150].replace('\n', ' ')
+            print(f"   ✅ Detected: {detected} (Expected: {expected_format})")
+            print(f"   📏 {len(content)} bytes → {len(markdown)} chars")
+            
+            # Show a preview of the conversion
+            if VERBOSE:
+                content_preview = markdown[:150].translate(PREVIEW_TABLE)
                 print(f"   📄 Preview: {content_preview}...")
-                print()
-                
-                results.append({
-                    "name": test_case["name"],
-                    "success": success,
-                    "detected": detected,
-                    "expected": test_case["expected_format"]
-                })
-            else:
-                print(f"   ❌ Failed: {response.status_code}")
-                print(f"   📄 Error: {response.text}")
-                print()
-                results.append({
-                    "name": test_case["name"], 
-                    "success": False,
-                    "error": response.text
-                })
-                
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
             print()
-            results.append({
-                "name": test_case["name"],
-                "success": False, 
-                "error": str(e)
-            })
+            
+            results.append(CaseResult(name, success, detected=detected, expected=expected_format))
+        else:
+            print(f"   ❌ Failed: {response.status_code}")
+            print(f"   📄 Error: {response.text}")
+            print()
+            results.append(CaseResult(name, False, expected=expected_format, error=response.text))
     
     return results
 
+def _post_file(file_path):
+    """Read one file and upload it on the shared keep-alive session; returns the bytes sent and the response"""
+    content = Path(file_path).read_bytes()
+    mime_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    return content, CLIENT.post("/convert", files={"file": (Path(file_path).name, content, mime_type)})
+
 def test_with_existing_files():
     """Test with any existing files in the directory"""
     print("📁 Testing with existing files...\n")
@@ -199,41 +267,40 @@ def test_with_existing_files():
         "main.py"
     ]
     
+    # One directory read answers every existence check instead of a stat per candidate.
+    present = {entry.name for entry in os.scandir(".") if entry.is_file()}
+    existing_files = [file_path for file_path in test_files if file_path in present]
+    # Reads and uploads overlap across files; httpx.Client is thread-safe.
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [(file_path, pool.submit(_post_file, file_path)) for file_path in existing_files]
+    
     results = []
-    for file_path in test_files:
-        if Path(file_path).exists():
-            print(f"📄 Testing with {file_path}...")
+    for file_path, future in futures:
+        print(f"📄 Testing with {file_path}...")
+        
+        try:
+            content, response = future.result()
             
-            try:
-                with open(file_path, "rb") as f:
-                    content = f.read()
+            if response.status_code == 200:
+                detected = detect_file_format(content)[0].lstrip(".")
+                print(f"   ✅ Detected: {detected}")
+                print(f"   📏 {len(content)} bytes → {len(response.text)} chars")
                 
-                response = requests.post(
-                    f"{BASE_URL}/convert",
-                    data=content,
-                    headers={"Content-Type": "application/octet-stream"}
-                )
+                results.append(CaseResult(
+                    file_path,
+                    True,
+                    detected=detected,
+                    size=len(content)
+                ))
+            else:
+                print(f"   ❌ Failed: {response.status_code}")
+                results.append(CaseResult(file_path, False))
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    print(f"   ✅ Detected: {result.get('detected_format', 'unknown')}")
-                    print(f"   📏 {result['original_length']} bytes → {result['converted_length']} chars")
-                    
-                    results.append({
-                        "file": file_path,
-                        "success": True,
-                        "format": result.get('detected_format', 'unknown'),
-                        "size": result['original_length']
-                    })
-                else:
-                    print(f"   ❌ Failed: {response.status_code}")
-                    results.append({"file": file_path, "success": False})
-                    
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
-                results.append({"file": file_path, "success": False, "error": str(e)})
-            
-            print()
+        except (httpx.TimeoutException, httpx.ConnectError) as e:
+            print(f"   ❌ Error: {e}")
+            results.append(CaseResult(file_path, False, error=str(e)))
+        
+        print()
     
     return results
 
@@ -271,23 +338,27 @@ def main():
     print("✅ Server is running\n")
     
     # Test enhanced capabilities
-    formats_data = test_formats_endpoint()
-    text_results = test_text_formats()
-    file_results = test_with_existing_files()
+    formats_data, text_results, file_results = run_suites_concurrently(
+        test_formats_endpoint,
+        lambda: asyncio.run(test_text_formats()),
+        test_with_existing_files,
+    )
     test_comparison_with_original()
+    text_results = text_results or []
+    file_results = file_results or []
     
     # Summary
     print("="*70)
     print("📋 TEST SUMMARY")
     print("="*70)
     
-    text_passed = sum(1 for r in text_results if r.get('success', False))
-    file_passed = sum(1 for r in file_results if r.get('success', False))
+    text_passed = sum(1 for r in text_results if r.success)
+    file_passed = sum(1 for r in file_results if r.success)
     
     print(f"📝 Text Format Tests: {text_passed}/{len(text_results)} passed")
     print(f"📁 File Tests: {file_passed}/{len(file_results)} passed")
     
-    if text_passed == len(text_results) and file_passed > 0:
+    if text_results and text_passed == len(text_results) and file_passed > 0:
         print("\n🎉 SUCCESS: Enhanced server supports comprehensive file format detection!")
         print("\n💡 Key Improvements:")
         print("   ✅ Automatic format detection from file content")
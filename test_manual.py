@@ -4,18 +4,20 @@ Manual test script for the MarkItDown FastAPI server.
 Run this script while the server is running to test functionality.
 """
 
-import requests
-import json
+import httpx
+import orjson
+
+from script_client import CLIENT
 
 def test_health_check():
     """Test the health check endpoint"""
     print("Testing health check endpoint...")
     try:
-        response = requests.get("http://localhost:8000/")
+        response = CLIENT.get("/")
         print(f"Status: {response.status_code}")
-        print(f"Response: {response.json()}")
+        print(f"Response: {orjson.loads(response.content)}")
         return response.status_code == 200
-    except Exception as e:
+    except (httpx.TimeoutException, httpx.ConnectError) as e:
         print(f"Health check failed: {e}")
         return False
 
@@ -41,24 +43,21 @@ def hello():
 """
     
     try:
-        response = requests.post(
-            "http://localhost:8000/convert",
-            data=markdown_content.encode('utf-8'),
-            headers={"Content-Type": "application/octet-stream"}
-        )
+        content = markdown_content.encode('utf-8')
+        response = CLIENT.post("/convert", files={"file": ("test.md", content, "text/markdown")})
         
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            result = response.json()
-            print(f"Success: {result['success']}")
-            print(f"Original length: {result['original_length']}")
-            print(f"Converted length: {result['converted_length']}")
-            print(f"Converted content (first 200 chars): {result['converted_content'][:200]}...")
+            # /convert answers with the markdown itself, not a JSON envelope
+            print(f"Content-Type: {response.headers['content-type']}")
+            print(f"Original length: {len(content)}")
+            print(f"Converted length: {len(response.text)}")
+            print(f"Converted content (first 200 chars): {response.text[:200]}...")
         else:
             print(f"Error: {response.text}")
         
         return response.status_code == 200
-    except Exception as e:
+    except (httpx.TimeoutException, httpx.ConnectError) as e:
         print(f"Conversion test failed: {e}")
         return False
 
@@ -67,16 +66,13 @@ def test_error_handling():
     print("\nTesting error handling...")
     
     try:
-        response = requests.post(
-            "http://localhost:8000/convert",
-            data=b"",
-            headers={"Content-Type": "application/octet-stream"}
-        )
+        response = CLIENT.post("/convert", files={"file": ("empty.txt", b"", "text/plain")})
         
+        body = orjson.loads(response.content)
         print(f"Status: {response.status_code}")
-        print(f"Response: {response.json()}")
-        return response.status_code == 400
-    except Exception as e:
+        print(f"Response: {body}")
+        return response.status_code == 400 and body.get("detail") == "Uploaded file is empty."
+    except (httpx.TimeoutException, httpx.ConnectError) as e:
         print(f"Error handling test failed: {e}")
         return False
 
@@ -3,49 +3,63 @@
 Test script to verify PDF to markdown conversion using the MarkItDown FastAPI server.
 """
 
-import requests
-import json
+import httpx
+import orjson
+import os
+
+from script_client import BASE_URL, CLIENT
+
+CONVERTED_PATH = 'test_pdf_converted.md'
+# ETag of the conversion saved in CONVERTED_PATH; re-runs send it so an unchanged PDF comes back as 412.
+ETAG_PATH = CONVERTED_PATH + '.etag'
 
 def test_pdf_conversion():
     """Test PDF to markdown conversion"""
     print("Testing PDF to Markdown conversion...")
     print("=" * 50)
     
-    # Read the PDF file as binary
+    # Only the size is read up front; the bytes are streamed from disk as the multipart upload is sent
     try:
-        with open('test.pdf', 'rb') as pdf_file:
-            pdf_content = pdf_file.read()
+        pdf_size = os.path.getsize('test.pdf')
         
-        print(f"✅ Successfully read test.pdf ({len(pdf_content):,} bytes)")
+        print(f"✅ Found test.pdf ({pdf_size:,} bytes)")
         
     except FileNotFoundError:
         print("❌ test.pdf file not found")
         return False
-    except Exception as e:
+    except OSError as e:
         print(f"❌ Error reading PDF file: {e}")
         return False
     
+    headers = {}
+    if os.path.exists(CONVERTED_PATH) and os.path.exists(ETAG_PATH):
+        with open(ETAG_PATH, 'r', encoding='utf-8') as etag_file:
+            headers["If-None-Match"] = etag_file.read().strip()
+    
     # Send PDF to conversion endpoint
     try:
         print("📤 Sending PDF to server for conversion...")
-        response = requests.post(
-            "http://localhost:8000/convert",
-            data=pdf_content,
-            headers={"Content-Type": "application/octet-stream"},
-            timeout=30  # 30 second timeout for PDF processing
-        )
+        with open('test.pdf', 'rb') as pdf_file:
+            response = CLIENT.post(
+                "/convert",
+                files={"file": ("test.pdf", pdf_file, "application/pdf")},
+                headers=headers,
+                timeout=httpx.Timeout(30.0, connect=1.0)  # 30 second timeout for PDF processing
+            )
         
         print(f"📥 Response Status: {response.status_code}")
         
+        if response.status_code == 412:
+            print(f"✅ PDF unchanged since the last run; '{CONVERTED_PATH}' is still current")
+            return True
+        
         if response.status_code == 200:
-            result = response.json()
+            # /convert answers with the markdown itself, not a JSON envelope
+            converted_content = response.text
             
             print("✅ Conversion successful!")
-            print(f"📊 Success: {result['success']}")
-            print(f"📏 Original size: {result['original_length']:,} bytes")
-            print(f"📄 Converted size: {result['converted_length']:,} characters")
-            
-            converted_content = result['converted_content']
+            print(f"📏 Original size: {pdf_size:,} bytes")
+            print(f"📄 Converted size: {len(converted_content):,} characters")
             
             # Check if content looks like markdown
             markdown_indicators = [
@@ -71,10 +85,13 @@ def test_pdf_conversion():
             
             # Save converted content to file
             try:
-                with open('test_pdf_converted.md', 'w', encoding='utf-8') as md_file:
+                with open(CONVERTED_PATH, 'w', encoding='utf-8') as md_file:
                     md_file.write(converted_content)
-                print("💾 Converted content saved to 'test_pdf_converted.md'")
-            except Exception as e:
+                print(f"💾 Converted content saved to '{CONVERTED_PATH}'")
+                if "ETag" in response.headers:
+                    with open(ETAG_PATH, 'w', encoding='utf-8') as etag_file:
+                        etag_file.write(response.headers["ETag"])
+            except OSError as e:
                 print(f"⚠️ Could not save to file: {e}")
             
             return True
@@ -82,33 +99,33 @@ def test_pdf_conversion():
         else:
             print(f"❌ Conversion failed with status {response.status_code}")
             try:
-                error_detail = response.json()
+                error_detail = orjson.loads(response.content)
                 print(f"Error details: {error_detail}")
-            except:
+            except ValueError:
                 print(f"Error response: {response.text}")
             return False
             
-    except requests.exceptions.Timeout:
+    except httpx.TimeoutException:
         print("❌ Request timed out - PDF processing took too long")
         return False
-    except requests.exceptions.ConnectionError:
-        print("❌ Could not connect to server. Is it running on http://localhost:8000?")
+    except httpx.ConnectError:
+        print(f"❌ Could not connect to server. Is it running on {BASE_URL}?")
         return False
-    except Exception as e:
+    except httpx.HTTPError as e:
         print(f"❌ Request failed: {e}")
         return False
 
 def test_server_health():
     """Quick health check before PDF test"""
     try:
-        response = requests.get("http://localhost:8000/", timeout=5)
+        response = CLIENT.get("/")
         if response.status_code == 200:
             print("✅ Server is running and healthy")
             return True
         else:
             print(f"⚠️ Server responded with status {response.status_code}")
             return False
-    except Exception as e:
+    except (httpx.TimeoutException, httpx.ConnectError) as e:
         print(f"❌ Server health check failed: {e}")
         return False
 
@@ -1,41 +1,48 @@
+import io
+import sys
 import pytest
-import asyncio
-from fastapi.testclient import TestClient
+import anyio
+from httpx import ASGITransport, AsyncClient
+from fastapi import HTTPException
 from main import app
+from markitdown_server.main import _CONVERSION_CACHE, _convert_upload_to_markdown
 
-client = TestClient(app)
+pytestmark = pytest.mark.anyio
 
-class TestMarkitdownServer:
-    """Test suite for the MarkItDown FastAPI server"""
-    
-    def test_health_check(self):
-        """Test the health check endpoint"""
-        response = client.get("/")
-        assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "MarkItDown Server is running"
-        assert data["status"] == "healthy"
-    
-    def test_convert_simple_markdown(self):
-        """Test converting simple markdown content"""
-        markdown_content = "# Hello World\n\nThis is a **test** markdown document."
-        
-        response = client.post(
-            "/convert",
-            content=markdown_content.encode('utf-8'),
-            headers={"Content-Type": "application/octet-stream"}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["original_length"] == len(markdown_content)
-        assert "converted_content" in data
-        assert len(data["converted_content"]) > 0
-    
-    def test_convert_complex_markdown(self):
-        """Test converting markdown with various elements"""
-        markdown_content = """# Main Title
+@pytest.fixture(scope="session")
+def anyio_backend():
+    """Run every test, and the shared client, on one asyncio event loop"""
+    # uvloop is the loop uvicorn[standard] serves with in production; it has no Windows build.
+    if sys.platform == "win32":
+        return "asyncio"
+    return ("asyncio", {"use_uvloop": True})
+
+@pytest.fixture(scope="session")
+async def client(anyio_backend):
+    """One AsyncClient for the whole run, calling the app in-process"""
+    # ASGITransport does not send lifespan events, so run the lifespan (MarkItDown setup) here, once.
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as async_client:
+            yield async_client
+
+@pytest.fixture(scope="session", autouse=True)
+async def _warm(client):
+    """Send one throwaway request so routing, validation and middleware are warm before any test is timed"""
+    # The lifespan already runs warm-up conversions on the MarkItDown instance; this covers the HTTP path around it.
+    await client.post(_CONVERT_URL, files=_markdown_upload(b"# warm"))
+
+# Shared, read-only request constants
+_CONVERT_URL = "/convert"
+
+def _markdown_upload(payload, filename="document.md"):
+    """Multipart form for /convert, which takes the document in its ``file`` field"""
+    return {"file": (filename, payload, "text/markdown")}
+
+# Request payloads, built and encoded once at import instead of in every test run
+SIMPLE_MD = "# Hello World\n\nThis is a **test** markdown document."
+SIMPLE_MD_BYTES = SIMPLE_MD.encode("utf-8")
+
+COMPLEX_MD = """# Main Title
 
 ## Subtitle
 
@@ -60,61 +67,9 @@ def hello():
 |----------|----------|
 | Value 1  | Value 2  |
 """
-        
-        response = client.post(
-            "/convert",
-            content=markdown_content.encode('utf-8'),
-            headers={"Content-Type": "application/octet-stream"}
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["original_length"] == len(markdown_content)
-        assert "converted_content" in data
-    
-    def test_convert_empty_content(self):
-        """Test with empty content"""
-        response = client.post(
-            "/convert",
-            content=b"",
-            headers={"Content-Type": "application/octet-stream"}
-        )
-        
-        assert response.status_code == 400
-        data = response.json()
-        assert "No content provided" in data["detail"]
-    
-    def test_convert_whitespace_only(self):
-        """Test with whitespace-only content"""
-        response = client.post(
-            "/convert",
-            content=b"   \n\t  \n  ",
-            headers={"Content-Type": "application/octet-stream"}
-        )
-        
-        assert response.status_code == 400
-        data = response.json()
-        assert "Empty content provided" in data["detail"]
-    
-    def test_convert_invalid_encoding(self):
-        """Test with invalid UTF-8 encoding"""
-        # Create invalid UTF-8 bytes
-        invalid_bytes = b'\xff\xfe\x00\x00'
-        
-        response = client.post(
-            "/convert",
-            content=invalid_bytes,
-            headers={"Content-Type": "application/octet-stream"}
-        )
-        
-        assert response.status_code == 400
-        data = response.json()
-        assert "Invalid content encoding" in data["detail"]
-    
-    def test_convert_unicode_content(self):
-        """Test with Unicode content"""
-        markdown_content = """# Unicode Test 🚀
+COMPLEX_MD_BYTES = COMPLEX_MD.encode("utf-8")
+
+UNICODE_MD = """# Unicode Test 🚀
 
 This document contains various Unicode characters:
 - Emoji: 😀 🎉 🔥
@@ -122,37 +77,86 @@ This document contains various Unicode characters:
 - Symbols: α β γ δ ε
 - Asian characters: 你好世界
 """
-        
-        response = client.post(
-            "/convert",
-            content=markdown_content.encode('utf-8'),
-            headers={"Content-Type": "application/octet-stream"}
-        )
+UNICODE_MD_BYTES = UNICODE_MD.encode("utf-8")
+
+LARGE_MD = "# Large Document\n\n" + "".join(
+    f"## Section {i+1}\n\n"
+    + f"This is paragraph {i+1} with some **bold** and *italic* text. " * 10
+    + "\n\n"
+    for i in range(100)
+)
+LARGE_MD_BYTES = LARGE_MD.encode("utf-8")
+
+class TestMarkitdownServer:
+    """Test suite for the MarkItDown FastAPI server"""
+    
+    async def test_health_check(self, client):
+        """Test the health check endpoint"""
+        response = await client.get("/")
+        assert response.status_code == 200
+        # The server serializes compactly, so the fields can be checked on the raw body without decoding it.
+        body = response.content
+        assert b'"message":"MarkItDown Server is running"' in body
+        assert b'"status":"healthy"' in body
+    
+    @pytest.mark.parametrize(
+        ("markdown_content", "payload"),
+        [
+            (SIMPLE_MD, SIMPLE_MD_BYTES),
+            (COMPLEX_MD, COMPLEX_MD_BYTES),
+            (UNICODE_MD, UNICODE_MD_BYTES),
+            (LARGE_MD, LARGE_MD_BYTES),
+        ],
+        ids=["simple", "complex", "unicode", "large"],
+    )
+    async def test_convert_ok(self, client, markdown_content, payload):
+        """Test converting simple, structured, Unicode and large markdown"""
+        response = await client.post(_CONVERT_URL, files=_markdown_upload(payload))
         
         assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["original_length"] == len(markdown_content)
+        assert response.headers["content-type"].startswith("text/markdown")
+        # Markdown is already the target format, so it comes back as sent, minus trailing whitespace.
+        assert response.text.splitlines() == [line.rstrip() for line in markdown_content.strip().splitlines()]
     
-    def test_convert_large_content(self):
-        """Test with larger content"""
-        # Generate a large markdown document
-        large_content = "# Large Document\n\n"
-        for i in range(100):
-            large_content += f"## Section {i+1}\n\n"
-            large_content += f"This is paragraph {i+1} with some **bold** and *italic* text. " * 10
-            large_content += "\n\n"
+    async def test_convert_rejects_empty_body(self, client):
+        """Test the HTTP contract for a rejected body: status and detail on the wire"""
+        response = await client.post(_CONVERT_URL, files=_markdown_upload(b""))
         
-        response = client.post(
-            "/convert",
-            content=large_content.encode('utf-8'),
-            headers={"Content-Type": "application/octet-stream"}
-        )
+        assert response.status_code == 400
+        assert b'"detail":"Uploaded file is empty."' in response.content
+    
+    @pytest.mark.parametrize(
+        ("payload", "expected_detail"),
+        [
+            (b"", "Uploaded file is empty."),
+            (b"   \n\t  \n  ", "Uploaded file is empty."),
+            (b"# Title\n" * 1024 + b"\xff\xfe\x00\x00", "Invalid text encoding for detected text format"),
+        ],
+        ids=["empty", "whitespace", "invalid-utf8"],
+    )
+    async def test_convert_rejects_bad_content(self, payload, expected_detail):
+        """Test that empty, blank and non-UTF-8 uploads are rejected"""
+        # Validation logic only: call the conversion helper directly instead of going through routing and HTTP.
+        with pytest.raises(HTTPException) as exc_info:
+            _convert_upload_to_markdown(io.BytesIO(payload))
         
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.detail == expected_detail
+    
+    async def test_convert_throughput(self, client, benchmark):
+        """Benchmark converting the large document, so throughput regressions show up between runs"""
+        # benchmark() is synchronous: time it from a worker thread that hands each request back to this event loop.
+        def convert_large():
+            return anyio.from_thread.run(
+                lambda: client.post(_CONVERT_URL, files=_markdown_upload(LARGE_MD_BYTES, "large.md"))
+            )
+        
+        # Empty the conversion cache before every round, otherwise each round after the first only times a cache hit.
+        response = await anyio.to_thread.run_sync(
+            lambda: benchmark.pedantic(convert_large, setup=_CONVERSION_CACHE.clear, rounds=20)
+        )
         assert response.status_code == 200
-        data = response.json()
-        assert data["success"] is True
-        assert data["original_length"] == len(large_content)
+        assert response.text
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"]) 
\ No newline at end of file
+    pytest.main([__file__, "-v", "-n", "auto"]) 
\ No newline at end of file
@@ -1,20 +1,46 @@
 from __future__ import annotations
 
+import base64
+import gzip
+import os
+from collections.abc import Iterator
+
+import pytest
 from fastapi.testclient import TestClient
 
+from markitdown_server import main
 from markitdown_server.main import app
 
 
-client = TestClient(app)
+@pytest.fixture(scope="module")
+def client() -> Iterator[TestClient]:
+    # Entering the client runs the lifespan, which builds the shared MarkItDown instance.
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def conversion_calls(monkeypatch) -> list[str]:
+    # Extensions of the conversions that reach MarkItDown, starting from an empty cache.
+    calls: list[str] = []
+    convert = main._convert_source_to_markdown
+
+    def counting_convert(*args, **kwargs):
+        calls.append(args[1])
+        return convert(*args, **kwargs)
 
+    monkeypatch.setattr(main, "_convert_source_to_markdown", counting_convert)
+    main._CONVERSION_CACHE.clear()
+    return calls
 
-def test_health() -> None:
+
+def test_health(client: TestClient) -> None:
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
 
-def test_convert_multipart_returns_text_markdown() -> None:
+def test_convert_multipart_returns_text_markdown(client: TestClient) -> None:
     payload = b"# Hello\n\nThis is a test document."
     response = client.post(
         "/convert",
@@ -26,7 +52,7 @@ def test_convert_multipart_returns_text_markdown() -> None:
     assert response.text.strip()
 
 
-def test_convert_empty_file_returns_400() -> None:
+def test_convert_empty_file_returns_400(client: TestClient) -> None:
     response = client.post(
         "/convert",
         files={"file": ("empty.md", b"", "text/markdown")},
@@ -36,9 +62,7 @@ def test_convert_empty_file_returns_400() -> None:
     assert "empty" in response.json()["detail"].lower()
 
 
-def test_legacy_base64_endpoint_is_still_available() -> None:
-    import base64
-
+def test_legacy_base64_endpoint_is_still_available(client: TestClient) -> None:
     content = base64.b64encode(b"# Hello from base64").decode("ascii")
     response = client.post("/convert-base64", json={"content": content, "filename": "sample.md"})
 
@@ -46,3 +70,293 @@ def test_legacy_base64_endpoint_is_still_available() -> None:
     data = response.json()
     assert data["success"] is True
     assert "converted_content" in data
+
+
+def test_base64_endpoint_decodes_across_chunks(client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(main, "_BASE64_CHUNK_CHARS", 8)
+    payload = b"# Chunked\n\nDecoded piece by piece into the temp file."
+    content = base64.b64encode(payload).decode("ascii")
+    response = client.post("/convert-base64", json={"content": content, "filename": "sample.md"})
+
+    assert response.status_code == 200, response.text
+    assert "Decoded piece by piece" in response.json()["converted_content"]
+
+    response = client.post("/convert-base64", json={"content": "QUE=QUFBQUFB", "filename": "sample.md"})
+    assert response.status_code == 400
+
+
+def test_base64_endpoint_rejects_truncated_payload(client: TestClient) -> None:
+    response = client.post("/convert-base64", json={"content": "IyBIZWxsbw", "filename": "sample.md"})
+
+    assert response.status_code == 400
+    assert "multiple of 4" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("batch_chars", [8, 4 * 1024 * 1024])
+def test_base64_stream_endpoint_decodes_unaligned_chunks(client: TestClient, monkeypatch, batch_chars: int) -> None:
+    monkeypatch.setattr(main, "_BASE64_CHUNK_CHARS", batch_chars)
+
+    encoded = base64.encodebytes(b"# Streamed\n\nDecoded as the request body arrives.")
+
+    def body():
+        for offset in range(0, len(encoded), 7):
+            yield encoded[offset : offset + 7]
+
+    response = client.post("/convert-base64-stream?filename=sample.md", content=body())
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["original_filename"] == "sample.md"
+    assert "Decoded as the request body arrives." in data["converted_content"]
+
+
+@pytest.mark.parametrize("path", ["/convert-base64", "/convert-base64-stream"])
+def test_base64_endpoints_sniff_large_json_from_both_ends(
+    client: TestClient, conversion_calls: list[str], path: str
+) -> None:
+    # Larger than the sniffed head, so the closing bracket is only visible in the tail.
+    payload = b"[" + b",".join(b'{"id": %d}' % i for i in range(8000)) + b"]"
+    encoded = base64.b64encode(payload)
+    assert len(payload) > main._SNIFF_BYTES
+
+    if path == "/convert-base64":
+        response = client.post(path, json={"content": encoded.decode("ascii")})
+    else:
+        response = client.post(path, content=encoded)
+
+    assert response.status_code == 200, response.text
+    assert conversion_calls == [".json"]
+
+
+def test_repeated_upload_is_served_from_cache(client: TestClient, conversion_calls: list[str]) -> None:
+    payload = b"# Cached\n\nSame bytes twice."
+
+    first = client.post("/convert", files={"file": ("cached.md", payload, "text/markdown")})
+    second = client.post("/convert", files={"file": ("cached.md", payload, "text/markdown")})
+
+    assert first.status_code == second.status_code == 200
+    assert first.text == second.text
+    assert conversion_calls == [".md"]
+
+
+def test_convert_rejects_invalid_utf8_after_sniffed_prefix(client: TestClient) -> None:
+    payload = b"plain text line\n" * 1024 + b"\xff\xfe broken tail"
+    response = client.post("/convert", files={"file": ("notes.txt", payload, "text/plain")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid text encoding for detected text format"
+
+
+@pytest.mark.parametrize("path", ["/convert-base64", "/convert-base64-stream", "/convert-batch"])
+def test_base64_endpoints_reject_invalid_utf8_after_sniffed_prefix(client: TestClient, path: str) -> None:
+    encoded = base64.b64encode(b"plain text line\n" * 1024 + b"\xff\xfe broken tail")
+    detail = "Invalid text encoding for detected text format"
+
+    if path == "/convert-base64-stream":
+        response = client.post(path, content=encoded)
+    elif path == "/convert-base64":
+        response = client.post(path, json={"content": encoded.decode("ascii"), "filename": "notes.txt"})
+    else:
+        response = client.post(path, json=[{"content": encoded.decode("ascii"), "filename": "notes.txt"}])
+        assert response.status_code == 200
+        assert response.json()[0]["status_code"] == 400
+        assert response.json()[0]["detail"] == detail
+        return
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == detail
+
+
+def test_convert_whitespace_only_file_returns_400(client: TestClient) -> None:
+    response = client.post("/convert", files={"file": ("blank.txt", b" \n\t\r\n", "text/plain")})
+
+    assert response.status_code == 400
+    assert "empty" in response.json()["detail"].lower()
+
+
+@pytest.mark.parametrize("size", [200, 140_000], ids=["within-sniffed-head", "beyond-sniffed-head"])
+@pytest.mark.parametrize("path", ["/convert", "/convert-base64"])
+def test_whitespace_only_documents_of_any_size_return_400(client: TestClient, path: str, size: int) -> None:
+    payload = b" \n" * (size // 2)
+
+    if path == "/convert":
+        response = client.post(path, files={"file": ("blank.txt", payload, "text/plain")})
+    else:
+        response = client.post(path, json={"content": base64.b64encode(payload).decode("ascii")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Uploaded file is empty."
+
+
+def test_convert_accepts_multibyte_text_split_across_validation_slices(client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(main, "_UPLOAD_CHUNK_BYTES", 7)
+    payload = ("Ünïcödé text line\n" * 1024).encode("utf-8")
+    response = client.post("/convert", files={"file": ("notes.txt", payload, "text/plain")})
+
+    assert response.status_code == 200, response.text
+    assert "Ünïcödé" in response.text
+
+
+def test_convert_reads_large_upload_from_spooled_file(client: TestClient) -> None:
+    payload = b"# Large\n\n" + b"A line of markdown body text.\n" * 100_000
+
+    response = client.post("/convert", files={"file": ("large.md", payload, "text/markdown")})
+
+    assert response.status_code == 200, response.text
+    assert response.text.startswith("# Large")
+
+
+def test_http_errors_keep_the_detail_contract(client: TestClient) -> None:
+    response = client.get("/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {"detail": "Not Found"}
+
+
+def test_large_base64_result_is_streamed_as_equivalent_json(client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(main, "_STREAM_RESPONSE_MIN_CHARS", 0)
+    monkeypatch.setattr(main, "_STREAM_RESPONSE_CHUNK_CHARS", 5)
+    source = '# Streamed "JSON"\n\nÜnïcödé, tabs\tand back\\slashes.'.encode("utf-8")
+    content = base64.b64encode(source).decode("ascii")
+
+    response = client.post("/convert-base64", json={"content": content, "filename": "quoted.md"})
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert list(data) == ["success", "original_filename", "converted_content", "converted_length"]
+    assert data["success"] is True
+    assert data["original_filename"] == "quoted.md"
+    assert "Ünïcödé" in data["converted_content"]
+    assert data["converted_length"] == len(data["converted_content"])
+
+
+def test_metrics_endpoint_counts_conversions(client: TestClient) -> None:
+    client.post("/convert", files={"file": ("metrics.md", b"# Metrics\n\nCounted once.", "text/markdown")})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f'markitdown_conversions_total{{format="md",cache="miss",pid="{os.getpid()}"}}' in response.text
+
+
+def test_markdown_passthrough_skips_markitdown(client: TestClient, monkeypatch) -> None:
+    monkeypatch.setattr(main, "_SKIP_MD_ROUNDTRIP", True)
+    monkeypatch.setattr(main.app.state.markitdown, "convert", lambda *args, **kwargs: pytest.fail("MarkItDown was called"))
+    main._CONVERSION_CACHE.clear()
+    source = "# Passthrough\n\n- kept *as is*\n".encode("utf-8")
+
+    multipart = client.post("/convert", files={"file": ("doc.md", source, "text/markdown")})
+    encoded = client.post(
+        "/convert-base64",
+        json={"content": base64.b64encode(source + b"\n").decode("ascii"), "filename": "doc.md"},
+    )
+
+    assert multipart.status_code == 200, multipart.text
+    assert multipart.text == "# Passthrough\n\n- kept *as is*"
+    assert encoded.status_code == 200, encoded.text
+    assert encoded.json()["converted_content"] == "# Passthrough\n\n- kept *as is*"
+
+
+def test_converter_decode_errors_are_server_errors(client: TestClient, monkeypatch) -> None:
+    def failing_convert(*args, **kwargs):
+        raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+    monkeypatch.setattr(main.app.state.markitdown, "convert", failing_convert)
+    main._CONVERSION_CACHE.clear()
+
+    response = client.post("/convert", files={"file": ("doc.md", b"# Valid UTF-8", "text/markdown")})
+
+    assert response.status_code == 500
+
+
+def test_batch_endpoint_reports_each_document_in_order(client: TestClient) -> None:
+    documents = [
+        {"content": base64.b64encode(b"# First batch document").decode("ascii"), "filename": "first.md"},
+        {"content": "IyBIZWxsbw", "filename": "truncated.md"},
+        {"content": "", "filename": "empty.md"},
+        {"content": base64.b64encode(b"name,age\nAda,36\nAlan,41").decode("ascii"), "filename": "people.csv"},
+    ]
+    response = client.post("/convert-batch", json=documents)
+
+    assert response.status_code == 200, response.text
+    first, truncated, empty, people = response.json()
+    assert first["success"] is True
+    assert "First batch document" in first["converted_content"]
+    assert first["converted_length"] == len(first["converted_content"])
+    assert truncated == {
+        "success": False,
+        "original_filename": "truncated.md",
+        "status_code": 400,
+        "detail": "Invalid base64 content: length is not a multiple of 4",
+    }
+    assert empty["status_code"] == 400
+    assert people["success"] is True
+    assert "Ada" in people["converted_content"]
+
+    assert client.post("/convert-batch", json=[]).status_code == 400
+
+
+def test_convert_honors_if_none_match_without_converting(client: TestClient, monkeypatch) -> None:
+    source = b"# Tagged\n\nSame bytes, same markdown."
+    first = client.post("/convert", files={"file": ("tagged.md", source, "text/markdown")})
+    etag = first.headers["etag"]
+
+    monkeypatch.setattr(main, "_convert_cached", lambda *args, **kwargs: pytest.fail("conversion was run"))
+    unchanged = client.post(
+        "/convert",
+        files={"file": ("tagged.md", source, "text/markdown")},
+        headers={"If-None-Match": f'W/"stale", {etag}'},
+    )
+
+    assert first.status_code == 200, first.text
+    assert unchanged.status_code == 412
+    assert unchanged.headers["etag"] == etag
+    assert unchanged.json()["detail"] == "Document unchanged: If-None-Match matches its ETag"
+
+    monkeypatch.undo()
+    changed = client.post(
+        "/convert",
+        files={"file": ("tagged.md", source + b"\nEdited.", "text/markdown")},
+        headers={"If-None-Match": etag},
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+    wildcard = client.post(
+        "/convert",
+        files={"file": ("tagged.md", source, "text/markdown")},
+        headers={"If-None-Match": "*"},
+    )
+    assert wildcard.status_code == 200
+
+
+def test_large_markdown_is_gzipped_for_accepting_clients(client: TestClient) -> None:
+    source = b"# Compressible\n\n" + b"The same markdown line, over and over.\n" * 200
+
+    gzipped = client.post(
+        "/convert", files={"file": ("big.md", source, "text/markdown")}, headers={"Accept-Encoding": "gzip"}
+    )
+    identity = client.post(
+        "/convert", files={"file": ("big.md", source, "text/markdown")}, headers={"Accept-Encoding": "identity"}
+    )
+    health = client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+    assert gzipped.status_code == 200, gzipped.text
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.text == identity.text
+    assert "content-encoding" not in identity.headers
+    assert "content-encoding" not in health.headers
+
+
+@pytest.mark.parametrize(("path", "precompressed"), [("/", "_ROOT_GZIP_BYTES"), ("/formats", "_FORMATS_GZIP_BYTES")])
+def test_static_documents_are_served_precompressed(client: TestClient, path: str, precompressed: str) -> None:
+    with client.stream("GET", path, headers={"Accept-Encoding": "gzip"}) as gzipped:
+        raw = b"".join(gzipped.iter_raw())
+    identity = client.get(path, headers={"Accept-Encoding": "identity"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert raw == getattr(main, precompressed)
+    assert "content-encoding" not in identity.headers
+    assert gzip.decompress(raw) == identity.content
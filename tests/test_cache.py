@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import sys
+
+from markitdown_server.cache import ConversionCache, content_digest, content_hasher
+
+
+def test_cache_evicts_least_recently_used_entry() -> None:
+    cache = ConversionCache(max_entries=2, max_bytes=1024 * 1024)
+    cache.put((b"a", ".md"), "A")
+    cache.put((b"b", ".md"), "B")
+    assert cache.get((b"a", ".md")) == "A"
+
+    cache.put((b"c", ".md"), "C")
+
+    assert cache.get((b"b", ".md")) is None
+    assert cache.get((b"a", ".md")) == "A"
+    assert cache.get((b"c", ".md")) == "C"
+
+
+def test_cache_keys_include_extension() -> None:
+    cache = ConversionCache(max_entries=4, max_bytes=1024 * 1024)
+    cache.put((b"same", ".txt"), "plain")
+
+    assert cache.get((b"same", ".csv")) is None
+
+
+def test_cache_evicts_to_stay_within_byte_budget() -> None:
+    entry_size = sys.getsizeof("x" * 100)
+    cache = ConversionCache(max_entries=10, max_bytes=2 * entry_size)
+    cache.put((b"a", ".md"), "a" * 100)
+    cache.put((b"b", ".md"), "b" * 100)
+    cache.put((b"c", ".md"), "c" * 100)
+    cache.put((b"huge", ".md"), "h" * 1000)
+
+    assert cache.get((b"a", ".md")) is None
+    assert cache.get((b"b", ".md")) == "b" * 100
+    assert cache.get((b"c", ".md")) == "c" * 100
+    assert cache.get((b"huge", ".md")) is None
+    assert cache.size_bytes == 2 * entry_size
+
+
+def test_zero_sized_cache_stores_nothing() -> None:
+    cache = ConversionCache(max_entries=0, max_bytes=1024 * 1024)
+    cache.put((b"a", ".md"), "A")
+
+    assert cache.get((b"a", ".md")) is None
+
+
+def test_incremental_hasher_matches_one_shot_digest() -> None:
+    hasher = content_hasher()
+    hasher.update(b"hello ")
+    hasher.update(b"world")
+
+    assert hasher.digest() == content_digest(b"hello world")
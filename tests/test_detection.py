@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from markitdown_server import main
+from markitdown_server.detection import detect_file_format
+from markitdown_server.main import _resolve_extension
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b"%PDF-1.4\n%Fake PDF", (".pdf", False)),
+        (b"PK\x03\x04\x14\x00\x00\x00word/document.xml", (".docx", False)),
+        (b"PK\x03\x04\x14\x00\x00\x00xl/workbook.xml", (".xlsx", False)),
+        (b"PK\x03\x04\x14\x00\x00\x00ppt/presentation.xml", (".pptx", False)),
+        (b"PK\x03\x04\x14\x00\x00\x00mimetypeapplication/epub+zip", (".epub", False)),
+        (b"PK\x03\x04\x14\x00\x00\x00[Content_Types].xml" + b"\x00" * 2000 + b"word/document.xml", (".zip", False)),
+        (b"PK\x03\x04\x14\x00\x00\x00plain.txt", (".zip", False)),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", (".jpg", False)),
+        (b"\x89PNG\r\n\x1a\n fake png", (".png", False)),
+        (b"GIF89a fake gif", (".gif", False)),
+        (b"RIFF\x24\x00\x00\x00WAVE fake wav", (".wav", False)),
+        (b"RIFF\x24\x00\x00\x00AVI fake avi", (".avi", False)),
+        (b"ID3\x03\x00\x00\x00 fake mp3", (".mp3", False)),
+        (b"\xff\xfb\x90\x00 fake mp3", (".mp3", False)),
+        (b"{\\rtf1\\ansi\\deff0 fake rtf}", (".rtf", False)),
+        (b"\x00\x00\x01\x00icon", (".ico", False)),
+        (b"\x1f\x8b\x08\x00", (".gz", False)),
+        (b"\xff\xfe\x00\x00", (".bin", False)),
+    ],
+)
+def test_detects_binary_signatures(content: bytes, expected: tuple[str, bool]) -> None:
+    assert detect_file_format(content) == expected
+
+
+@pytest.mark.parametrize(
+    ("content", "expected"),
+    [
+        (b'{"name": "test", "value": 123}', ".json"),
+        (b'<?xml version="1.0"?><root><item>test</item></root>', ".xml"),
+        (b"<html><head><title>Test</title></head><body><h1>Hello</h1></body></html>", ".html"),
+        (b"<DIV CLASS='x'>Upper-case markup</DIV>", ".html"),
+        (b"<?XML version='1.0'?><root/>", ".xml"),
+        (b"name,age,city\nJohn,30,NYC\nJane,25,LA", ".csv"),
+        (b"Name\tAge\nJohn\t30\nJane\t28", ".tsv"),
+        (b"# Markdown Test\n\nThis is a **bold** test", ".md"),
+        (b"Plain text content\nWith multiple lines\nAnd some content.", ".txt"),
+        (b"   \n", ".txt"),
+    ],
+)
+def test_detects_text_formats(content: bytes, expected: str) -> None:
+    assert detect_file_format(content) == (expected, True)
+
+
+def test_text_sniffing_tolerates_multibyte_split_at_prefix_boundary() -> None:
+    content = ("é" * 5000).encode("utf-8")
+
+    assert detect_file_format(content) == (".txt", True)
+
+
+@pytest.mark.parametrize(
+    ("filename", "expected"),
+    [
+        ("report.PDF", ".pdf"),
+        ("legacy.xls", ".xls"),
+        ("payload.exe", ".bin"),
+        ("no_extension", ".bin"),
+        ("archive.v2/notes", ".bin"),
+        (None, ".bin"),
+    ],
+)
+def test_filename_hint_only_applies_known_extensions(filename: str | None, expected: str) -> None:
+    assert _resolve_extension(b"\xff\xfe\x00\x00", filename) == (expected, False)
+
+
+def test_every_signature_is_reachable_through_first_byte_dispatch() -> None:
+    from markitdown_server.detection import _BINARY_SIGNATURES, _SIGNATURES_BY_FIRST_BYTE
+
+    for extension, prefixes in _BINARY_SIGNATURES.items():
+        for prefix in prefixes:
+            bucket = _SIGNATURES_BY_FIRST_BYTE[prefix[:1]]
+            assert any(prefix in bucket_prefixes and ext == extension for bucket_prefixes, ext in bucket)
+
+
+def test_json_detection_uses_tail_when_given_only_the_head() -> None:
+    head = b'{"items": [' + b'{"n": 1}, ' * 100
+
+    assert detect_file_format(head)[0] != ".json"
+    assert detect_file_format(head, tail=b'{"n": 1}]}\n') == (".json", True)
+
+
+class _FakeMagika:
+    def __init__(self, extensions: list[str], is_text: bool) -> None:
+        self.output = SimpleNamespace(extensions=extensions, is_text=is_text)
+        self.calls = 0
+
+    def identify_bytes(self, content: bytes) -> SimpleNamespace:
+        self.calls += 1
+        return SimpleNamespace(output=self.output)
+
+
+@pytest.mark.parametrize(
+    ("extensions", "is_text", "expected"),
+    [
+        (["md", "markdown"], True, ".md"),
+        (["js", "mjs"], True, ".txt"),
+        (["pdf"], False, ".txt"),
+    ],
+)
+def test_magika_refines_weak_text_results(
+    monkeypatch: pytest.MonkeyPatch, extensions: list[str], is_text: bool, expected: str
+) -> None:
+    monkeypatch.setattr(main, "_MAGIKA", _FakeMagika(extensions, is_text))
+
+    assert _resolve_extension(b"Plain text content\nWith two lines", None) == (expected, True)
+
+
+def test_magika_is_skipped_when_filename_or_signature_decides(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeMagika(["md"], True)
+    monkeypatch.setattr(main, "_MAGIKA", fake)
+
+    assert _resolve_extension(b"Plain text content", "notes.csv") == (".csv", True)
+    assert _resolve_extension(b"Plain text content", "script.txt") == (".txt", True)
+    assert _resolve_extension(b"%PDF-1.4\n", None) == (".pdf", False)
+    assert fake.calls == 0
+
+
+def test_magika_is_not_loaded_when_fallback_is_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(main, "_MAGIKA_FALLBACK", False)
+    monkeypatch.setattr(main, "_MAGIKA", None)
+
+    assert _resolve_extension(b"Plain text content", None) == (".txt", True)
+    assert main._MAGIKA is None
+
+
+def test_magika_result_is_reused_for_the_same_digest(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = _FakeMagika(["md"], True)
+    monkeypatch.setattr(main, "_MAGIKA", fake)
+    monkeypatch.setattr(main, "_MAGIKA_RESULTS", main.ConversionCache(max_entries=8, max_bytes=1024))
+    content = b"Plain text content\nWith two lines"
+
+    first = _resolve_extension(content, None, digest=b"digest")
+    second = _resolve_extension(content, None, digest=b"digest")
+
+    assert first == second == (".md", True)
+    assert fake.calls == 1
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from markitdown_server.limits import BodySizeLimitMiddleware
+
+
+def _limited_app(max_body_bytes: int) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(BodySizeLimitMiddleware, max_body_bytes=max_body_bytes)
+
+    @app.post("/raw")
+    async def raw(request: Request) -> dict:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+        return {"size": size}
+
+    @app.post("/upload")
+    async def upload(file: UploadFile) -> dict:
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def test_declared_oversized_body_is_rejected_up_front() -> None:
+    client = TestClient(_limited_app(16))
+
+    response = client.post("/raw", content=b"x" * 17)
+
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body exceeds the 16 byte limit"}
+
+
+def test_chunked_oversized_body_is_cut_off_mid_stream() -> None:
+    client = TestClient(_limited_app(16))
+
+    def body():
+        for _ in range(4):
+            yield b"x" * 8
+
+    response = client.post("/raw", content=body())
+
+    assert response.status_code == 413
+
+
+def test_oversized_multipart_upload_is_rejected() -> None:
+    client = TestClient(_limited_app(64))
+
+    response = client.post("/upload", files={"file": ("big.bin", b"x" * 1024, "application/octet-stream")})
+
+    assert response.status_code == 413
+
+
+def test_bodies_within_limit_pass_through() -> None:
+    client = TestClient(_limited_app(16))
+
+    response = client.post("/raw", content=b"x" * 16)
+
+    assert response.status_code == 200
+    assert response.json() == {"size": 16}
@@ -68,3 +68,21 @@ def test_request_logging_redacts_base64_content_at_debug(monkeypatch):
     log_output = stream.getvalue()
     assert '"content":"[redacted]"' in log_output
     assert "base64-document" not in log_output
+
+
+def test_request_logging_is_silent_above_info(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setenv("LOG_LEVEL", "WARNING")
+    configure_logging(stream=stream)
+
+    app = FastAPI()
+    add_request_logging_middleware(app)
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    response = TestClient(app).get("/ping")
+
+    assert response.status_code == 200
+    assert stream.getvalue() == ""
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import os
+
+from markitdown_server.metrics import MetricsCollector
+
+
+def test_render_reports_counters_and_cumulative_histogram() -> None:
+    metrics = MetricsCollector()
+    metrics.record(".pdf", input_bytes=1000, output_chars=200, duration_ns=20_000_000, cache_hit=False)
+    metrics.record(".pdf", input_bytes=1000, output_chars=200, duration_ns=1_000, cache_hit=True)
+    metrics.record_failure(".docx")
+
+    text = metrics.render()
+    pid = os.getpid()
+
+    assert f'markitdown_conversions_total{{format="pdf",cache="miss",pid="{pid}"}} 1' in text
+    assert f'markitdown_conversions_total{{format="pdf",cache="hit",pid="{pid}"}} 1' in text
+    assert f'markitdown_conversion_failures_total{{format="docx",pid="{pid}"}} 1' in text
+    assert f'markitdown_input_bytes_total{{format="pdf",pid="{pid}"}} 2000' in text
+    assert f'markitdown_conversion_duration_seconds_bucket{{format="pdf",le="0.005",pid="{pid}"}} 1' in text
+    assert f'markitdown_conversion_duration_seconds_bucket{{format="pdf",le="0.025",pid="{pid}"}} 2' in text
+    assert f'markitdown_conversion_duration_seconds_bucket{{format="pdf",le="+Inf",pid="{pid}"}} 2' in text
+    assert f'markitdown_conversion_duration_seconds_count{{format="pdf",pid="{pid}"}} 2' in text
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import io
+
+from markitdown_server import spool as spool_module
+from markitdown_server.spool import Spool
+
+
+def test_spool_rolls_over_into_configured_directory(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(spool_module, "SPOOL_MAX_MEMORY_BYTES", 8)
+    monkeypatch.setattr(spool_module, "SPOOL_DIR", str(tmp_path))
+
+    with Spool() as spool:
+        spool.write(b"12345")
+        assert isinstance(spool.file, io.BytesIO)
+        spool.write(b"67890")
+
+        assert not isinstance(spool.file, io.BytesIO)
+        assert spool.rewind().read() == b"1234567890"
+
+
+def test_resolve_spool_dir_prefers_environment(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("MARKITDOWN_TMPDIR", str(tmp_path))
+
+    assert spool_module._resolve_spool_dir() == str(tmp_path)
+
+
+def test_resolve_spool_dir_defaults_to_system_temp_dir(monkeypatch) -> None:
+    monkeypatch.delenv("MARKITDOWN_TMPDIR", raising=False)
+
+    assert spool_module._resolve_spool_dir() is None
+
+
+def test_temp_file_pool_reuses_truncated_files(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(spool_module, "SPOOL_DIR", str(tmp_path))
+    pool = spool_module.TempFilePool(max_size=1)
+
+    first = pool.acquire()
+    first.write(b"stale bytes")
+    pool.release(first)
+    reused = pool.acquire()
+
+    assert reused is first
+    assert reused.tell() == 0
+    assert reused.read() == b""
+
+    extra = pool.acquire()
+    pool.release(reused)
+    pool.release(extra)
+    assert extra.closed
+    reused.close()
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from markitdown_server.workers import available_cpus, worker_count
+
+
+@pytest.mark.parametrize(
+    ("cpu_max", "expected"),
+    [
+        ("150000 100000\n", 2),
+        ("50000 100000\n", 1),
+        ("max 100000\n", None),
+        ("garbage\n", None),
+    ],
+)
+def test_available_cpus_honours_cgroup_quota(tmp_path, cpu_max: str, expected: int | None) -> None:
+    cpu_max_path = tmp_path / "cpu.max"
+    cpu_max_path.write_text(cpu_max)
+    affinity = len(os.sched_getaffinity(0))
+
+    assert available_cpus(str(cpu_max_path)) == (affinity if expected is None else min(expected, affinity))
+
+
+def test_available_cpus_without_cgroup_file_uses_affinity(tmp_path) -> None:
+    assert available_cpus(str(tmp_path / "missing")) == len(os.sched_getaffinity(0))
+
+
+@pytest.mark.parametrize(("configured", "expected"), [(None, 1), ("", 1), ("4", 4), ("0", 1)])
+def test_worker_count_defaults_to_a_single_process(monkeypatch, configured: str | None, expected: int) -> None:
+    if configured is None:
+        monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    else:
+        monkeypatch.setenv("WEB_CONCURRENCY", configured)
+
+    assert worker_count() == expected